@@ -1,38 +1,39 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from pymongo import MongoClient
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import os
-from dotenv import load_dotenv
+import time
 from bson import ObjectId
 import json
 from flask_cors import CORS
 
-# ✅ Correct Gemini import
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
+from chat_core import (
+    CHAT_SECONDS, DB_NAME, FALLBACK_REPLY, GREETING, HISTORY_WINDOW, LLM_SECONDS, MONGO_READ_SECONDS,
+    MONGO_WRITE_SECONDS, SESSION_TTL, USE_MONGOMOCK, MONGO_URI, build_prompt, fold_due, fold_request,
+    health_report, history_cache, make_chat_model, message_doc, mongo_ping_due, record_mongo_ping,
+    response_cache, sse, timed,
+)
+from message_store import MessageStore
+import metrics
 
-# Load environment variables
-load_dotenv()
+# Configuration, prompt building and metrics are shared with async_app.py (see chat_core.py)
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:3000"], supports_credentials=True)
 
-# Database setup
-MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-db = client["ChatApp"]
-conversations = db["conversations"]
-
-# Gemini setup
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-GEMINI_MODEL = "gemini-1.5-flash"
+# Database setup (MONGO_URI=mongomock://... uses an in-memory stand-in)
+if USE_MONGOMOCK:
+    import mongomock
+    client = mongomock.MongoClient()
+else:
+    client = MongoClient(MONGO_URI)
+db = client[DB_NAME]
+store = MessageStore(db, ttl=SESSION_TTL)
+summary_pool = ThreadPoolExecutor(max_workers=2)
 
-chat_model = ChatGoogleGenerativeAI(
-    model=GEMINI_MODEL,
-    temperature=0.7,
-    google_api_key=GOOGLE_API_KEY
-)
+chat_model = make_chat_model()
 
 # ✅ Custom JSON Encoder for ObjectId and datetime
 class JSONEncoder(json.JSONEncoder):
@@ -45,105 +46,218 @@ class JSONEncoder(json.JSONEncoder):
 
 app.json_encoder = JSONEncoder
 
+# Make sure the session and bucket indexes exist before serving
+try:
+    store.ensure_indexes()
+except Exception as e:
+    print("Index bootstrap failed:", e)
+
 # Root endpoint
 @app.route("/")
 def home():
     return jsonify({"message": "Welcome to Flask Backend!"})
 
+def prepare_history(session_id, user_message):
+    """Return the user's message document, the LangChain prompt for this turn
+    and its response-cache key (None when the cache is off).
+
+    Nothing is written here; save_response stores the user's message together
+    with the reply, so a turn costs one write.
+    """
+    user_doc = message_doc("user", user_message)
+
+    # Recent context comes from the cache when this process has it, otherwise
+    # only the last HISTORY_WINDOW messages are read from the newest buckets
+    recent_msgs = history_cache.get(session_id)
+    if recent_msgs is None:
+        with timed(MONGO_READ_SECONDS, op="history"):
+            recent_msgs = store.recent(session_id, HISTORY_WINDOW)
+            summary = store.summary(session_id)
+        history_cache.set(session_id, recent_msgs, summary)
+    else:
+        summary = history_cache.summary(session_id)
+
+    prompt, reply_key = build_prompt(summary, recent_msgs, user_doc)
+    return user_doc, prompt, reply_key
+
+def save_response(session_id, user_doc, agent_response):
+    ai_doc = message_doc("assistant", agent_response)
+    with timed(MONGO_WRITE_SECONDS, op="append"):
+        store.append(session_id, user_doc, ai_doc)
+    window = history_cache.append(session_id, user_doc, ai_doc)
+    if window is not None:
+        summary_pool.submit(fold_history, session_id, window)
+
+def fold_history(session_id, window):
+    """Fold messages that left the verbatim window into the session's rolling summary."""
+    if not fold_due(session_id, window):
+        return
+    try:
+        # The store, not this process's window, decides what still needs folding
+        with timed(MONGO_READ_SECONDS, op="summary"):
+            summary = store.summary(session_id)
+            messages = store.messages_after(session_id, summary and summary["until"])
+        fold = fold_request(summary, messages)
+        if fold is None:
+            if summary:
+                history_cache.set_summary(session_id, summary)
+            return
+        prompt, until = fold
+        with LLM_SECONDS.time(mode="summary", outcome="ok") as labels:
+            try:
+                text = chat_model.invoke(prompt).content
+            except Exception:
+                labels["outcome"] = "error"
+                raise
+        with timed(MONGO_WRITE_SECONDS, op="summary"):
+            store.set_summary(session_id, text, until)
+    except Exception as e:
+        # summary_until is left where it was, so the next fold retries these messages
+        print("History summary error:", e)
+        return
+    history_cache.set_summary(session_id, {"text": text, "until": until})
+
 # Chat endpoint
 @app.route("/chat", methods=["POST"])
 def chat():
+    started = time.perf_counter()
     data = request.get_json()
     session_id = data.get("session_id")
     user_message = data.get("message")
 
     if not session_id or not user_message:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat", outcome="invalid")
         return jsonify({"error": "session_id and message are required"}), 400
 
-    # Save user message
-    user_doc = {"role": "user", "content": user_message, "timestamp": datetime.utcnow()}
-    conversations.update_one(
-        {"session_id": session_id},
-        {"$push": {"messages": user_doc}, "$setOnInsert": {"session_id": session_id, "created_at": datetime.utcnow()}},
-        upsert=True
-    )
-
-    # Fetch last 20 messages for context
-    conversation_doc = conversations.find_one({"session_id": session_id})
-    recent_msgs = conversation_doc.get("messages", [])[-20:]
-
-    # Prepare messages for LangChain
-    history = []
-    for msg in recent_msgs:
-        if msg["role"] == "user":
-            history.append(HumanMessage(content=msg["content"]))
-        else:
-            history.append(SystemMessage(content=msg["content"]))
-
-    # Add identity context
-    identity = SystemMessage(content="Your name is Omaju, a fun and friendly AI ChatBOT, created by Aditya Katyal. Don't specify it every time; mention it only if user asks.")
-    full_history = [identity] + history
+    try:
+        user_doc, full_history, reply_key = prepare_history(session_id, user_message)
+    except Exception:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat", outcome="error")
+        raise
 
     # Generate AI response
+    outcome = "ok"
+    agent_response = response_cache.get(reply_key) if reply_key else None
+    if agent_response is not None:
+        outcome = "cached"
+    else:
+        with LLM_SECONDS.time(mode="invoke", outcome="ok") as labels:
+            try:
+                agent_msg = chat_model.invoke(full_history)
+                agent_response = agent_msg.content
+                if reply_key:
+                    response_cache.put(reply_key, agent_response)
+            except Exception as e:
+                print("GenAI invocation error:", e)
+                agent_response = FALLBACK_REPLY
+                labels["outcome"] = outcome = "error"
+
+    # Save the turn (user message and reply) in one write
     try:
-        agent_msg = chat_model.invoke(full_history)
-        agent_response = agent_msg.content
-    except Exception as e:
-        print("GenAI invocation error:", e)
-        agent_response = "Sorry, I am having trouble generating a response."
+        save_response(session_id, user_doc, agent_response)
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat", outcome=outcome)
+    return jsonify({"response": agent_response})
 
-    # Save AI response
-    ai_doc = {"role": "assistant", "content": agent_response, "timestamp": datetime.utcnow()}
-    conversations.update_one({"session_id": session_id}, {"$push": {"messages": ai_doc}})
+# Streaming chat endpoint (server-sent events)
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    started = time.perf_counter()
+    data = request.get_json()
+    session_id = data.get("session_id")
+    user_message = data.get("message")
 
-    return jsonify({"response": agent_response})
+    if not session_id or not user_message:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat_stream", outcome="invalid")
+        return jsonify({"error": "session_id and message are required"}), 400
+
+    try:
+        user_doc, full_history, reply_key = prepare_history(session_id, user_message)
+    except Exception:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat_stream", outcome="error")
+        raise
+
+    def generate():
+        outcome = "ok"
+        cached = response_cache.get(reply_key) if reply_key else None
+        if cached is not None:
+            outcome = "cached"
+            parts = [cached]
+            yield sse({"token": cached})
+        else:
+            parts = []
+            with LLM_SECONDS.time(mode="stream", outcome="ok") as labels:
+                try:
+                    for chunk in chat_model.stream(full_history):
+                        if chunk.content:
+                            parts.append(chunk.content)
+                            yield sse({"token": chunk.content})
+                    if reply_key:
+                        response_cache.put(reply_key, "".join(parts))
+                except Exception as e:
+                    print("GenAI streaming error:", e)
+                    labels["outcome"] = outcome = "error"
+                    if not parts:
+                        parts.append(FALLBACK_REPLY)
+                        yield sse({"token": parts[0]})
+        agent_response = "".join(parts)
+        try:
+            save_response(session_id, user_doc, agent_response)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat_stream", outcome=outcome)
+        yield sse({"response": agent_response}, event="done")
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # Fetch conversation by session
 @app.route("/messages/<session_id>", methods=["GET"])
 def get_messages(session_id):
-    conversation_doc = conversations.find_one({"session_id": session_id})
-    if not conversation_doc:
+    with timed(MONGO_READ_SECONDS, op="session"):
+        session = store.session(session_id)
+    if not session:
         # New session → create it with Omaju's greeting
-        greeting = {
-            "role": "assistant",
-            "content": "Hey! I am **Omaju**, your buddy for lone times. How may I help?",
-            "timestamp": datetime.utcnow()
-        }
-        conversations.insert_one({
-            "session_id": session_id,
-            "created_at": datetime.utcnow(),
-            "messages": [greeting]
-        })
+        greeting = message_doc("assistant", GREETING)
+        with timed(MONGO_WRITE_SECONDS, op="append"):
+            store.append(session_id, greeting)
+        history_cache.set(session_id, [greeting])
         return jsonify({
             "session_id": session_id,
             "created_at": datetime.utcnow().isoformat(),
             "messages": [greeting]
         })
-    return jsonify(conversation_doc)
+    with timed(MONGO_READ_SECONDS, op="messages"):
+        session["messages"] = store.messages(session_id)
+    return jsonify(session)
 
 # Clear a session's messages
 @app.route("/clear/<session_id>", methods=["POST"])
 def clear_messages(session_id):
-    conversations.delete_one({"session_id": session_id})
+    store.delete(session_id)
+    history_cache.invalidate(session_id)
     return jsonify({"message": f"Session {session_id} cleared!"})
 
 # Health check
 @app.route("/health", methods=["GET"])
 def health():
-    try:
-        client.admin.command('ping')
-        mongo_status = "connected"
-    except Exception as e:
-        mongo_status = f"disconnected ({str(e)})"
-
-    gemini_status = "configured" if GOOGLE_API_KEY else "not configured"
+    if mongo_ping_due():
+        try:
+            client.admin.command('ping')
+            record_mongo_ping()
+        except Exception as e:
+            record_mongo_ping(e)
+    return jsonify(health_report())
 
-    return jsonify({
-        "status": "healthy" if mongo_status == "connected" else "unhealthy",
-        "mongodb": mongo_status,
-        "genai": gemini_status,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+# Prometheus scrape endpoint
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
-    app.run(PORT=5000, debug=True)
+    app.run(port=int(os.getenv("PORT", "5000")), debug=True)
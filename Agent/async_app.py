@@ -0,0 +1,265 @@
+from quart import Quart, request, jsonify, Response
+from quart_cors import cors
+from datetime import datetime
+import asyncio
+import time
+
+from chat_core import (
+    CHAT_SECONDS, DB_NAME, FALLBACK_REPLY, GREETING, HISTORY_WINDOW, LLM_SECONDS, MONGO_READ_SECONDS,
+    MONGO_WRITE_SECONDS, SESSION_TTL, USE_MONGOMOCK, MONGO_URI, build_prompt, fold_due, fold_request,
+    health_report, history_cache, make_chat_model, message_doc, mongo_ping_due, record_mongo_ping,
+    response_cache, sse, timed,
+)
+from message_store import AsyncMessageStore
+import metrics
+
+# Async (ASGI) variant of app.py: same routes and storage layout, but Mongo
+# and the model are awaited, so one process can hold many chats in flight.
+# Run with an ASGI server, e.g. `hypercorn async_app:app --bind 0.0.0.0:5000`.
+# Configuration, prompt building and metrics are shared with app.py (see chat_core.py).
+
+app = Quart(__name__)
+app = cors(app, allow_origin="http://localhost:3000", allow_credentials=True)
+
+# Database setup (MONGO_URI=mongomock://... uses an in-memory stand-in)
+if USE_MONGOMOCK:
+    from stubs import AsyncMongoClient
+    client = AsyncMongoClient()
+else:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(MONGO_URI)
+db = client[DB_NAME]
+store = AsyncMessageStore(db, ttl=SESSION_TTL)
+
+chat_model = make_chat_model()
+
+
+@app.before_serving
+async def bootstrap_indexes():
+    try:
+        await store.ensure_indexes()
+    except Exception as e:
+        print("Index bootstrap failed:", e)
+
+
+# Root endpoint
+@app.route("/")
+async def home():
+    return jsonify({"message": "Welcome to Quart Backend!"})
+
+
+async def prepare_history(session_id, user_message):
+    """Return the user's message document, the LangChain prompt for this turn
+    and its response-cache key (None when the cache is off).
+
+    Nothing is written here; save_response stores the user's message together
+    with the reply, so a turn costs one write.
+    """
+    user_doc = message_doc("user", user_message)
+
+    # Recent context comes from the cache when this process has it, otherwise
+    # only the last HISTORY_WINDOW messages are read from the newest buckets
+    recent_msgs = history_cache.get(session_id)
+    if recent_msgs is None:
+        with timed(MONGO_READ_SECONDS, op="history"):
+            recent_msgs = await store.recent(session_id, HISTORY_WINDOW)
+            summary = await store.summary(session_id)
+        history_cache.set(session_id, recent_msgs, summary)
+    else:
+        summary = history_cache.summary(session_id)
+
+    prompt, reply_key = build_prompt(summary, recent_msgs, user_doc)
+    return user_doc, prompt, reply_key
+
+
+async def save_response(session_id, user_doc, agent_response):
+    ai_doc = message_doc("assistant", agent_response)
+    with timed(MONGO_WRITE_SECONDS, op="append"):
+        await store.append(session_id, user_doc, ai_doc)
+    window = history_cache.append(session_id, user_doc, ai_doc)
+    if window is not None:
+        app.add_background_task(fold_history, session_id, window)
+
+
+async def fold_history(session_id, window):
+    """Fold messages that left the verbatim window into the session's rolling summary."""
+    if not fold_due(session_id, window):
+        return
+    try:
+        # The store, not this process's window, decides what still needs folding
+        with timed(MONGO_READ_SECONDS, op="summary"):
+            summary = await store.summary(session_id)
+            messages = await store.messages_after(session_id, summary and summary["until"])
+        fold = fold_request(summary, messages)
+        if fold is None:
+            if summary:
+                history_cache.set_summary(session_id, summary)
+            return
+        prompt, until = fold
+        with LLM_SECONDS.time(mode="summary", outcome="ok") as labels:
+            try:
+                text = (await chat_model.ainvoke(prompt)).content
+            except Exception:
+                labels["outcome"] = "error"
+                raise
+        with timed(MONGO_WRITE_SECONDS, op="summary"):
+            await store.set_summary(session_id, text, until)
+    except Exception as e:
+        # summary_until is left where it was, so the next fold retries these messages
+        print("History summary error:", e)
+        return
+    history_cache.set_summary(session_id, {"text": text, "until": until})
+
+
+# Chat endpoint
+@app.route("/chat", methods=["POST"])
+async def chat():
+    started = time.perf_counter()
+    data = await request.get_json()
+    session_id = data.get("session_id")
+    user_message = data.get("message")
+
+    if not session_id or not user_message:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat", outcome="invalid")
+        return jsonify({"error": "session_id and message are required"}), 400
+
+    try:
+        user_doc, full_history, reply_key = await prepare_history(session_id, user_message)
+    except Exception:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat", outcome="error")
+        raise
+
+    # Generate AI response without blocking the event loop
+    outcome = "ok"
+    # The cache's disk tier is SQLite, so lookups and writes run off the event loop
+    agent_response = await asyncio.to_thread(response_cache.get, reply_key) if reply_key else None
+    if agent_response is not None:
+        outcome = "cached"
+    else:
+        with LLM_SECONDS.time(mode="invoke", outcome="ok") as labels:
+            try:
+                agent_msg = await chat_model.ainvoke(full_history)
+                agent_response = agent_msg.content
+                if reply_key:
+                    await asyncio.to_thread(response_cache.put, reply_key, agent_response)
+            except Exception as e:
+                print("GenAI invocation error:", e)
+                agent_response = FALLBACK_REPLY
+                labels["outcome"] = outcome = "error"
+
+    try:
+        await save_response(session_id, user_doc, agent_response)
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat", outcome=outcome)
+    return jsonify({"response": agent_response})
+
+
+# Streaming chat endpoint (server-sent events)
+@app.route("/chat/stream", methods=["POST"])
+async def chat_stream():
+    started = time.perf_counter()
+    data = await request.get_json()
+    session_id = data.get("session_id")
+    user_message = data.get("message")
+
+    if not session_id or not user_message:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat_stream", outcome="invalid")
+        return jsonify({"error": "session_id and message are required"}), 400
+
+    try:
+        user_doc, full_history, reply_key = await prepare_history(session_id, user_message)
+    except Exception:
+        CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat_stream", outcome="error")
+        raise
+
+    async def generate():
+        outcome = "ok"
+        cached = await asyncio.to_thread(response_cache.get, reply_key) if reply_key else None
+        if cached is not None:
+            outcome = "cached"
+            parts = [cached]
+            yield sse({"token": cached})
+        else:
+            parts = []
+            with LLM_SECONDS.time(mode="stream", outcome="ok") as labels:
+                try:
+                    async for chunk in chat_model.astream(full_history):
+                        if chunk.content:
+                            parts.append(chunk.content)
+                            yield sse({"token": chunk.content})
+                    if reply_key:
+                        await asyncio.to_thread(response_cache.put, reply_key, "".join(parts))
+                except Exception as e:
+                    print("GenAI streaming error:", e)
+                    labels["outcome"] = outcome = "error"
+                    if not parts:
+                        parts.append(FALLBACK_REPLY)
+                        yield sse({"token": parts[0]})
+        agent_response = "".join(parts)
+        try:
+            await save_response(session_id, user_doc, agent_response)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            CHAT_SECONDS.observe(time.perf_counter() - started, endpoint="chat_stream", outcome=outcome)
+        yield sse({"response": agent_response}, event="done")
+
+    response = Response(generate(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.timeout = None
+    return response
+
+
+# Fetch conversation by session
+@app.route("/messages/<session_id>", methods=["GET"])
+async def get_messages(session_id):
+    with timed(MONGO_READ_SECONDS, op="session"):
+        session = await store.session(session_id)
+    if not session:
+        # New session → create it with Omaju's greeting
+        greeting = message_doc("assistant", GREETING)
+        with timed(MONGO_WRITE_SECONDS, op="append"):
+            await store.append(session_id, greeting)
+        history_cache.set(session_id, [greeting])
+        return jsonify({
+            "session_id": session_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "messages": [greeting]
+        })
+    with timed(MONGO_READ_SECONDS, op="messages"):
+        session["messages"] = await store.messages(session_id)
+    return jsonify(session)
+
+
+# Clear a session's messages
+@app.route("/clear/<session_id>", methods=["POST"])
+async def clear_messages(session_id):
+    await store.delete(session_id)
+    history_cache.invalidate(session_id)
+    return jsonify({"message": f"Session {session_id} cleared!"})
+
+
+# Health check
+@app.route("/health", methods=["GET"])
+async def health():
+    if mongo_ping_due():
+        try:
+            await client.admin.command('ping')
+            record_mongo_ping()
+        except Exception as e:
+            record_mongo_ping(e)
+    return jsonify(health_report())
+
+
+# Prometheus scrape endpoint
+@app.route("/metrics", methods=["GET"])
+async def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+if __name__ == "__main__":
+    app.run(port=5000, debug=True)
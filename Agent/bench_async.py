@@ -0,0 +1,65 @@
+"""Load benchmark for async_app.py against a stub LLM and an in-memory Mongo.
+
+Example:
+  python bench_async.py --requests 1000 --concurrency 300 --llm-latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from http_utils import percentile
+
+
+async def run(requests_total: int, concurrency: int, sessions: int):
+    import async_app
+
+    test_client = async_app.app.test_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await test_client.post("/chat", json={
+                "session_id": f"bench_{i % sessions}",
+                "message": f"Benchmark message {i}",
+            })
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests_total)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the async /chat endpoint locally")
+    parser.add_argument("--requests", type=int, default=500, help="Total /chat requests (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at once (default: 200)")
+    parser.add_argument("--sessions", type=int, default=100, help="Distinct session ids (default: 100)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub model latency in seconds (default: 0.5)")
+    args = parser.parse_args()
+
+    os.environ["MONGO_URI"] = "mongomock://localhost"
+    os.environ["USE_STUB_LLM"] = "true"
+    os.environ["STUB_LLM_LATENCY"] = str(args.llm_latency)
+
+    elapsed, latencies, errors = asyncio.run(run(args.requests, args.concurrency, args.sessions))
+
+    print(f"Requests:     {args.requests} ({errors} errors)")
+    print(f"Concurrency:  {args.concurrency}")
+    print(f"Wall time:    {elapsed:.2f}s (serial would be ~{args.requests * args.llm_latency:.0f}s)")
+    print(f"Throughput:   {args.requests / elapsed:.1f} req/s")
+    print(f"Latency mean: {statistics.mean(latencies) * 1000:.0f} ms")
+    for pct in (50, 95, 99):
+        print(f"Latency p{pct}:  {percentile(latencies, pct) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Configuration, prompt building and metrics shared by app.py and async_app.py.
+
+The two backends differ only in how they reach Mongo and the model (blocking
+calls in Flask, awaited ones in Quart). Everything that does no I/O lives
+here, so a change to the prompt, the caches or the metrics is made once.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from dotenv import load_dotenv
+from langchain.schema import HumanMessage, SystemMessage
+
+import metrics
+from history_cache import HistoryCache
+from history_compactor import HistoryCompactor
+from response_cache import ResponseCache, cache_key
+
+# Load environment variables
+load_dotenv()
+
+# Database setup (MONGO_URI=mongomock://... uses an in-memory stand-in)
+MONGO_URI = os.getenv("MONGO_URI")
+USE_MONGOMOCK = bool(MONGO_URI and MONGO_URI.startswith("mongomock://"))
+DB_NAME = "ChatApp"
+# Sessions and their messages are kept in fixed-size buckets (see message_store.py);
+# sessions expire SESSION_TTL_DAYS after creation when set; the default 0 keeps them forever
+SESSION_TTL = int(float(os.getenv("SESSION_TTL_DAYS", "0")) * 24 * 3600)
+
+# Prompt context window and the per-process cache of it
+HISTORY_WINDOW = 20
+history_cache = HistoryCache(
+    max_sessions=int(os.getenv("HISTORY_CACHE_SESSIONS", "1000")),
+    window=HISTORY_WINDOW,
+    ttl=float(os.getenv("HISTORY_CACHE_TTL", "300"))
+)
+# Newest messages go into the prompt verbatim up to HISTORY_TOKEN_BUDGET tokens;
+# older ones are folded into a rolling summary kept with the session
+compactor = HistoryCompactor(
+    budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "2000")),
+    max_recent=HISTORY_WINDOW - 2
+)
+# The summary is rebuilt from the stored messages after its `until`, so messages
+# missed by a failed fold, a restart or another worker are folded in later;
+# a long backlog is folded SUMMARY_BATCH messages per turn
+SUMMARY_BATCH = 200
+
+# Gemini setup (USE_STUB_LLM=true answers locally after STUB_LLM_LATENCY seconds)
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+GEMINI_MODEL = "gemini-1.5-flash"
+
+
+def make_chat_model():
+    if os.getenv("USE_STUB_LLM", "").lower() in ("1", "true", "yes"):
+        from stubs import StubChatModel
+        return StubChatModel(latency=float(os.getenv("STUB_LLM_LATENCY", "0.2")))
+    # ✅ Correct Gemini import
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=GEMINI_MODEL,
+        temperature=0.7,
+        google_api_key=GOOGLE_API_KEY
+    )
+
+
+IDENTITY = "Your name is Omaju, a fun and friendly AI ChatBOT, created by Aditya Katyal. Don't specify it every time; mention it only if user asks."
+GREETING = "Hey! I am **Omaju**, your buddy for lone times. How may I help?"
+FALLBACK_REPLY = "Sorry, I am having trouble generating a response."
+
+# Optional exact-match cache of replies to repeated prompts (RESPONSE_CACHE=true),
+# keyed on the full prompt of the turn
+response_cache = None
+if os.getenv("RESPONSE_CACHE", "").lower() in ("1", "true", "yes"):
+    response_cache = ResponseCache(
+        path=os.getenv("RESPONSE_CACHE_PATH", "response_cache.sqlite"),
+        ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+        max_entries=int(os.getenv("RESPONSE_CACHE_ENTRIES", "1000"))
+    )
+
+# Per-stage histograms, served on /metrics
+MONGO_READ_SECONDS = metrics.histogram("omaju_mongo_read_seconds", "Time spent reading from MongoDB", labelnames=("op", "outcome"))
+MONGO_WRITE_SECONDS = metrics.histogram("omaju_mongo_write_seconds", "Time spent writing to MongoDB", labelnames=("op", "outcome"))
+LLM_SECONDS = metrics.histogram("omaju_llm_seconds", "Model call duration", labelnames=("mode", "outcome"))
+PROMPT_TOKENS = metrics.histogram("omaju_prompt_tokens", "Estimated prompt size in tokens", buckets=metrics.TOKEN_BUCKETS)
+CHAT_SECONDS = metrics.histogram("omaju_chat_seconds", "End-to-end chat request latency", labelnames=("endpoint", "outcome"))
+
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Time the block into `histogram` with outcome="ok", or "error" when it raises."""
+    with histogram.time(outcome="ok", **labels) as labels:
+        try:
+            yield labels
+        except Exception:
+            labels["outcome"] = "error"
+            raise
+
+
+# /health reuses its Mongo ping for HEALTH_CACHE_SECONDS, so frequent polling stays cheap
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+mongo_health = {"status": None, "checked_at": 0.0}
+
+
+def message_doc(role, content):
+    return {"role": role, "content": content, "timestamp": datetime.utcnow()}
+
+
+def build_prompt(summary, recent_msgs, user_doc):
+    """Return the LangChain prompt for this turn and its response-cache key
+    (None when the cache is off)."""
+    # Only the newest messages that fit the token budget are sent verbatim;
+    # the rolling summary stands in for everything before them
+    _, context = compactor.split(recent_msgs + [user_doc])
+
+    # Prepare messages for LangChain
+    history = []
+    if summary:
+        history.append(SystemMessage(content=f"Summary of the earlier conversation: {summary['text']}"))
+    for msg in context:
+        if msg["role"] == "user":
+            history.append(HumanMessage(content=msg["content"]))
+        else:
+            history.append(SystemMessage(content=msg["content"]))
+
+    # Add identity context
+    prompt = [SystemMessage(content=IDENTITY)] + history
+    PROMPT_TOKENS.observe(sum(compactor.count_tokens(msg.content) for msg in prompt))
+    reply_key = cache_key(prompt, GEMINI_MODEL) if response_cache else None
+    return prompt, reply_key
+
+
+def fold_due(session_id, window):
+    """Whether messages in this process's `window` have left the verbatim part
+    without being in the summary it knows about."""
+    summary = history_cache.summary(session_id) or {}
+    return bool(compactor.pending(window, summary.get("until")))
+
+
+def fold_request(summary, messages):
+    """(summary prompt, until) for the oldest SUMMARY_BATCH messages of `messages`
+    (the session's messages after summary["until"], read from the store) that
+    left the verbatim window; None when there are none."""
+    pending = compactor.pending(messages, summary and summary["until"])[:SUMMARY_BATCH]
+    if not pending:
+        return None
+    prompt = compactor.summary_prompt(summary and summary["text"], pending)
+    return [HumanMessage(content=prompt)], pending[-1]["timestamp"]
+
+
+def sse(data, event=None):
+    """Format one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def mongo_ping_due():
+    return mongo_health["status"] is None or time.monotonic() - mongo_health["checked_at"] > HEALTH_CACHE_SECONDS
+
+
+def record_mongo_ping(error=None):
+    mongo_health["status"] = "connected" if error is None else f"disconnected ({str(error)})"
+    mongo_health["checked_at"] = time.monotonic()
+
+
+def health_report():
+    mongo_status = mongo_health["status"]
+    return {
+        "status": "healthy" if mongo_status == "connected" else "unhealthy",
+        "mongodb": mongo_status,
+        "genai": "configured" if GOOGLE_API_KEY else "not configured",
+        "response_cache": response_cache.stats() if response_cache else "disabled",
+        "timestamp": datetime.utcnow().isoformat()
+    }
@@ -3,9 +3,18 @@ import requests
 import json
 import sys
 import os
+import re
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+from http_utils import DEFAULT_TIMEOUT, make_http_session, percentile, request_with_retries
+from transcript_writer import TranscriptWriter
+
 # Import speech utilities (optional)
 try:
     from speech_utils import SpeechHandler
@@ -14,21 +23,74 @@ except ImportError:
     SPEECH_AVAILABLE = False
     print("Warning: Speech utilities not available. Install required packages for speech features.")
 
+class IncrementalSpeaker:
+    """Speaks streamed text sentence by sentence on a background thread."""
+
+    SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+    def __init__(self, speech_handler):
+        self.speech_handler = speech_handler
+        self.buffer = ""
+        self.sentences = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            sentence = self.sentences.get()
+            if sentence is None:
+                break
+            self.speech_handler.speak_text(sentence)
+
+    def feed(self, token: str):
+        self.buffer += token
+        *complete, self.buffer = self.SENTENCE_END.split(self.buffer)
+        for sentence in complete:
+            if sentence.strip():
+                self.sentences.put(sentence.strip())
+
+    def close(self):
+        """Speak whatever is left and wait until playback has finished."""
+        if self.buffer.strip():
+            self.sentences.put(self.buffer.strip())
+        self.buffer = ""
+        self.sentences.put(None)
+        self.thread.join()
+
+
 class ChatClient:
-    def __init__(self, base_url: str = "http://localhost:5000", session_id: Optional[str] = None):
+    def __init__(self, base_url: str = "http://localhost:5000", session_id: Optional[str] = None,
+                 http: Optional[requests.Session] = None, timeout=DEFAULT_TIMEOUT, retries: int = 3,
+                 enable_speech: bool = True, rotate_bytes: Optional[int] = None,
+                 speech_backend: Optional[str] = None):
         self.base_url = base_url.rstrip('/')
         self.session_id = session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         self.conversation_history = []
+
+        # One pooled keep-alive session for every request (can be shared between clients)
+        self.http = http or make_http_session()
+        self.timeout = timeout
+        self.retries = retries
+
+        # Background writers for --save files, opened on first use
+        self.rotate_bytes = rotate_bytes
+        self.transcripts: Dict[str, TranscriptWriter] = {}
         
         # Initialize speech handler if available
         self.speech_handler = None
-        if SPEECH_AVAILABLE:
+        self.speech_backend = speech_backend
+        if SPEECH_AVAILABLE and enable_speech:
             try:
-                self.speech_handler = SpeechHandler(use_offline_tts=False)
+                self.speech_handler = SpeechHandler(use_offline_tts=False, recognizer_backend=speech_backend)
                 print("✓ Speech features enabled")
             except Exception as e:
                 print(f"Warning: Speech features disabled due to error: {e}")
     
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures (see http_utils.request_with_retries)."""
+        kwargs.setdefault("timeout", self.timeout)
+        return request_with_retries(self.http, method, f"{self.base_url}{path}", self.retries, **kwargs)
+
     def send_message(self, message: str) -> Optional[str]:
         try:
             # Prepare request payload
@@ -38,12 +100,7 @@ class ChatClient:
             }
             
             # Send POST request to /chat endpoint
-            response = requests.post(
-                f"{self.base_url}/chat",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            response = self._request("POST", "/chat", json=payload)
             
             if response.status_code == 200:
                 data = response.json()
@@ -77,9 +134,69 @@ class ChatClient:
             print(f"Error sending message: {e}")
             return None
     
+    def send_message_stream(self, message: str, on_token=None) -> Optional[str]:
+        """Send a message to /chat/stream and hand each token to on_token as it arrives."""
+        try:
+            payload = {
+                "session_id": self.session_id,
+                "message": message
+            }
+
+            response = self._request(
+                "POST", "/chat/stream",
+                json=payload,
+                headers={"Accept": "text/event-stream"},
+                stream=True
+            )
+
+            if response.status_code != 200:
+                print(f"Error: HTTP {response.status_code}")
+                try:
+                    error_data = response.json()
+                    print(f"Error details: {error_data.get('error', 'Unknown error')}")
+                except:
+                    print(f"Response: {response.text}")
+                return None
+
+            parts = []
+            final = None
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    event = None
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):].strip())
+                    if event == "done":
+                        final = data.get("response")
+                    elif "token" in data:
+                        parts.append(data["token"])
+                        if on_token:
+                            on_token(data["token"])
+
+            ai_response = final if final is not None else "".join(parts)
+            self.conversation_history.append({
+                "timestamp": datetime.now(),
+                "user": message,
+                "ai": ai_response
+            })
+            return ai_response
+
+        except requests.exceptions.ConnectionError:
+            print(f"Error: Could not connect to backend at {self.base_url}")
+            print("Make sure the Flask backend is running.")
+            return None
+        except requests.exceptions.Timeout:
+            print("Error: Request timed out")
+            return None
+        except Exception as e:
+            print(f"Error sending message: {e}")
+            return None
+
     def get_conversation_history(self) -> Optional[Dict[str, Any]]:
         try:
-            response = requests.get(f"{self.base_url}/history/{self.session_id}")
+            response = self._request("GET", f"/messages/{self.session_id}")
             
             if response.status_code == 200:
                 return response.json()
@@ -91,7 +208,28 @@ class ChatClient:
             print(f"Error retrieving history: {e}")
             return None
     
-    def chat_loop(self, use_mic: bool = False, use_tts: bool = False, save_file: Optional[str] = None):
+    def _stream_reply(self, user_input: str, use_tts: bool) -> Optional[str]:
+        """Print (and optionally speak) the reply while it is still being generated."""
+        speaker = IncrementalSpeaker(self.speech_handler) if use_tts and self.speech_handler else None
+        started = [False]
+
+        def on_token(token):
+            if not started[0]:
+                print("🤖 AI: ", end="", flush=True)
+                started[0] = True
+            print(token, end="", flush=True)
+            if speaker:
+                speaker.feed(token)
+
+        ai_response = self.send_message_stream(user_input, on_token=on_token)
+        if started[0]:
+            print()
+        if speaker:
+            speaker.close()
+        return ai_response
+
+    def chat_loop(self, use_mic: bool = False, use_tts: bool = False, save_file: Optional[str] = None,
+                  stream: bool = False):
         print(f"🤖 Conversational Agent Client")
         print(f"📡 Backend: {self.base_url}")
         print(f"🆔 Session: {self.session_id}")
@@ -110,7 +248,10 @@ class ChatClient:
                 # Get user input
                 if use_mic and self.speech_handler:
                     print("\n🎤 Listening... (speak your message)")
-                    success, user_input = self.speech_handler.listen_to_mic()
+                    success, user_input = self.speech_handler.listen_to_mic(
+                        on_partial=lambda text: print(f"\r🎧 {text}", end="", flush=True)
+                    )
+                    print()
                     if not success:
                         print(f"Speech recognition failed: {user_input}")
                         continue
@@ -142,6 +283,15 @@ class ChatClient:
                 if not user_input:
                     continue
                 
+                # Streamed replies are printed and spoken as they arrive
+                if stream:
+                    ai_response = self._stream_reply(user_input, use_tts)
+                    if ai_response and save_file:
+                        self._save_to_file(user_input, ai_response, save_file)
+                    elif not ai_response:
+                        print("❌ Failed to get response from backend")
+                    continue
+
                 # Send message to backend
                 print("🔄 Sending message...")
                 ai_response = self.send_message(user_input)
@@ -176,6 +326,7 @@ class ChatClient:
         print(f"   Session ID: {self.session_id}")
         if save_file:
             print(f"   Saved to: {save_file}")
+        self.close_transcripts()
     
     def _show_help(self):
         """Show available commands."""
@@ -210,27 +361,103 @@ class ChatClient:
         
         # Test backend connection
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self._request("GET", "/health", timeout=(3.05, 5))
             if response.status_code == 200:
                 health_data = response.json()
                 print(f"  Backend Status: {health_data.get('status', 'Unknown')}")
                 print(f"  MongoDB: {health_data.get('mongodb', 'Unknown')}")
-                print(f"  OpenAI: {health_data.get('openai', 'Unknown')}")
+                print(f"  GenAI: {health_data.get('genai', 'Unknown')}")
             else:
                 print(f"  Backend Status: HTTP {response.status_code}")
         except:
             print("  Backend Status: Connection failed")
     
     def _save_to_file(self, user_msg: str, ai_msg: str, filename: str):
-        """Save conversation to file."""
-        try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(filename, 'a', encoding='utf-8') as f:
-                f.write(f"[{timestamp}] User: {user_msg}\n")
-                f.write(f"[{timestamp}] AI: {ai_msg}\n")
-                f.write("-" * 50 + "\n")
-        except Exception as e:
-            print(f"⚠️  Failed to save to file: {e}")
+        """Queue a turn for the background transcript writer of `filename`."""
+        writer = self.transcripts.get(filename)
+        if writer is None:
+            writer = self.transcripts[filename] = TranscriptWriter(filename, rotate_bytes=self.rotate_bytes)
+        writer.write(user_msg, ai_msg, self.session_id)
+
+    def close_transcripts(self):
+        """Write out everything still queued and close the transcript files."""
+        for writer in self.transcripts.values():
+            writer.close()
+        self.transcripts.clear()
+
+
+def run_bench(base_url: str, total: int, concurrency: int = 1, message: str = "Hello! What can you do?",
+              stream: bool = False, timeout=DEFAULT_TIMEOUT, retries: int = 3) -> Dict[str, Any]:
+    """Send `total` messages, `concurrency` at a time, and report throughput and latency."""
+    http = make_http_session(pool_size=concurrency)
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    clients = [
+        ChatClient(base_url, session_id=f"bench_{run_id}_{i}", http=http, timeout=timeout,
+                   retries=retries, enable_speech=False)
+        for i in range(concurrency)
+    ]
+
+    def one(i: int):
+        client = clients[i % concurrency]
+        started = time.perf_counter()
+        if stream:
+            reply = client.send_message_stream(f"{message} ({i})")
+        else:
+            reply = client.send_message(f"{message} ({i})")
+        return time.perf_counter() - started, reply is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    http.close()
+
+    latencies = [latency for latency, ok in results if ok]
+    return {
+        "requests": total,
+        "errors": total - len(latencies),
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "mean": statistics.mean(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+    }
+
+
+def print_bench(report: Dict[str, Any]):
+    print(f"\n📊 Benchmark: {report['requests']} messages, concurrency {report['concurrency']}")
+    print(f"   Errors:       {report['errors']}")
+    print(f"   Wall time:    {report['elapsed']:.2f}s")
+    print(f"   Throughput:   {report['throughput']:.1f} msg/s")
+    print(f"   Latency mean: {report['mean'] * 1000:.0f} ms")
+    for key in ("p50", "p90", "p95", "p99", "max"):
+        print(f"   Latency {key}:{' ' * (5 - len(key))}{report[key] * 1000:.0f} ms")
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def positive_float(value):
+    """argparse type for rates and durations that must be greater than 0."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid float value: '{value}'")
+    if not number > 0 or number == float("inf"):
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value}")
+    return number
+
 
 def main():
     """Main entry point for the client application."""
@@ -244,7 +471,11 @@ Examples:
   python client.py --tts             # Speak AI responses aloud
   python client.py --mic --tts       # Full speech interaction
   python client.py --save chat.txt   # Save conversation to file
+  python client.py --save chat.jsonl --rotate-mb 50  # JSONL transcript, gzipped every 50 MB
+  python client.py --stream --tts    # Print and speak replies as they stream in
   python client.py --url http://192.168.1.100:5000  # Custom backend URL
+  python client.py --bench 200 --concurrency 20      # Throughput and latency percentiles
+  python client.py --load dialogues.json --rate 20 --duration 60 --report run.csv  # Load test
         """
     )
     
@@ -257,12 +488,53 @@ Examples:
                        help='Use text-to-speech for AI responses')
     parser.add_argument('--offline-tts', action='store_true',
                        help='Use offline TTS (pyttsx3) instead of online (gTTS)')
+    parser.add_argument('--speech-backend', choices=['google', 'vosk', 'whisper'],
+                       help='Speech recognition engine for --mic (default: $SPEECH_BACKEND or google)')
     parser.add_argument('--save', metavar='FILE',
                        help='Save conversation to specified file')
+    parser.add_argument('--rotate-mb', type=float, metavar='MB',
+                       help='Gzip the --save file and start a new one once it passes MB megabytes')
+    parser.add_argument('--stream', action='store_true',
+                       help='Stream replies token by token from /chat/stream')
     parser.add_argument('--test-speech', action='store_true',
                        help='Test speech features and exit')
+    parser.add_argument('--bench', type=positive_int, metavar='N',
+                       help='Send N messages, report throughput and latency percentiles, and exit')
+    parser.add_argument('--concurrency', type=positive_int, default=1,
+                       help='Messages in flight at once with --bench (default: 1)')
+    parser.add_argument('--load', nargs='?', const='', metavar='DIALOGUES',
+                       help='Replay scripted dialogues (JSON or blank-line separated text) at --rate and exit')
+    parser.add_argument('--rate', type=positive_float, default=10.0,
+                       help='Target requests per second with --load (default: 10)')
+    parser.add_argument('--duration', type=positive_float, default=30.0,
+                       help='Seconds to run --load for (default: 30)')
+    parser.add_argument('--users', type=positive_int, default=20,
+                       help='Simulated users with --load (default: 20)')
+    parser.add_argument('--report', metavar='FILE',
+                       help='Write --load results to FILE (.csv per request, .json summary + requests)')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_TIMEOUT[0],
+                       help=f'Connect timeout in seconds (default: {DEFAULT_TIMEOUT[0]})')
+    parser.add_argument('--read-timeout', type=float, default=DEFAULT_TIMEOUT[1],
+                       help=f'Read timeout in seconds (default: {DEFAULT_TIMEOUT[1]})')
+    parser.add_argument('--retries', type=int,
+                       help='Retries on timeouts, connection errors and 5xx responses (default: 3, 0 with --load)')
     
     args = parser.parse_args()
+    timeout = (args.connect_timeout, args.read_timeout)
+
+    if args.load is not None:
+        from load_generator import main_load
+        summary = main_load(args.url, args.load or None, args.rate, args.duration, max(1, args.users),
+                            report=args.report, timeout=timeout, retries=args.retries or 0)
+        sys.exit(1 if summary["requests"] and summary["error_rate"] == 1 else 0)
+    if args.retries is None:
+        args.retries = 3
+
+    if args.bench:
+        report = run_bench(args.url, args.bench, concurrency=max(1, args.concurrency), stream=args.stream,
+                           timeout=timeout, retries=args.retries)
+        print_bench(report)
+        sys.exit(1 if report["errors"] == report["requests"] else 0)
     
     # Test speech features if requested
     if args.test_speech:
@@ -271,7 +543,7 @@ Examples:
             sys.exit(1)
         
         print("🧪 Testing Speech Features...")
-        handler = SpeechHandler(use_offline_tts=args.offline_tts)
+        handler = SpeechHandler(use_offline_tts=args.offline_tts, recognizer_backend=args.speech_backend)
         
         # Test microphone
         if handler.test_microphone():
@@ -298,12 +570,18 @@ Examples:
     
     # Create and run client
     try:
-        client = ChatClient(base_url=args.url, session_id=args.session)
+        rotate_bytes = int(args.rotate_mb * 1024 * 1024) if args.rotate_mb else None
+        client = ChatClient(base_url=args.url, session_id=args.session, timeout=timeout, retries=args.retries,
+                            rotate_bytes=rotate_bytes, speech_backend=args.speech_backend)
         
         # Update speech handler if offline TTS requested
         if args.offline_tts and client.speech_handler:
             try:
-                client.speech_handler = SpeechHandler(use_offline_tts=True)
+                # Reuse the already loaded recognition model
+                client.speech_handler.use_offline_tts = True
+                client.speech_handler.init_offline_tts()
+                if not client.speech_handler.use_offline_tts:
+                    raise RuntimeError("pyttsx3 could not be initialized")
                 print("✓ Offline TTS enabled")
             except Exception as e:
                 print(f"Warning: Failed to enable offline TTS: {e}")
@@ -312,7 +590,8 @@ Examples:
         client.chat_loop(
             use_mic=args.mic,
             use_tts=args.tts,
-            save_file=args.save
+            save_file=args.save,
+            stream=args.stream
         )
         
     except KeyboardInterrupt:
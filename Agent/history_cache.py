@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class HistoryCache:
+    """In-process LRU of the most recent messages per session.
+
+    Entries are kept current by the write path (`append`) so a turn usually
+    needs no history read at all. Each entry can also carry the session's
+    rolling summary (see history_compactor.py). Entries also expire after `ttl` seconds,
+    which bounds drift when several worker processes serve the same session.
+
+    An append to a current entry restarts its clock, since this process has
+    just written those messages; a busy session is then only re-read once it
+    has been idle for `ttl` seconds. Appends to an expired entry drop it.
+    """
+
+    def __init__(self, max_sessions: int = 1000, window: int = 20, ttl: float = 300.0):
+        self.max_sessions = max_sessions
+        self.window = window
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            stored_at, messages, _ = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return list(messages)
+
+    def set(self, session_id: str, messages: List[dict], summary: Optional[dict] = None):
+        with self._lock:
+            self._entries[session_id] = (time.monotonic(), list(messages[-self.window:]), summary)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def append(self, session_id: str, *messages: dict) -> Optional[List[dict]]:
+        """Add freshly written messages to a cached session; returns the new window or None if not cached."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            stored_at, cached, summary = entry
+            now = time.monotonic()
+            if now - stored_at > self.ttl:
+                del self._entries[session_id]
+                return None
+            cached = (cached + list(messages))[-self.window:]
+            self._entries[session_id] = (now, cached, summary)
+            self._entries.move_to_end(session_id)
+            return list(cached)
+
+    def summary(self, session_id: str) -> Optional[dict]:
+        """The cached rolling summary ({"text", "until"}) of a session, if any."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return entry[2] if entry else None
+
+    def set_summary(self, session_id: str, summary: dict):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries[session_id] = (entry[0], entry[1], summary)
+
+    def invalidate(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
@@ -0,0 +1,64 @@
+import math
+from typing import Callable, List, Optional, Tuple
+
+# Per-message overhead for role markers and separators
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+class HistoryCompactor:
+    """Keeps prompts within a token budget on long sessions.
+
+    The newest messages go into the prompt verbatim until `budget` tokens (or
+    `max_recent` messages) are used; everything older is represented by a
+    rolling summary. The summary is extended incrementally: only messages
+    newer than the point it already covers are folded in, and it is stored
+    with the session so it survives restarts.
+    """
+
+    def __init__(self, budget: int = 2000, max_recent: int = 18, summary_words: int = 200,
+                 count_tokens: Callable[[str], int] = estimate_tokens):
+        self.budget = budget
+        self.max_recent = max_recent
+        self.summary_words = summary_words
+        self.count_tokens = count_tokens
+
+    def message_tokens(self, msg: dict) -> int:
+        return self.count_tokens(msg["content"]) + MESSAGE_OVERHEAD
+
+    def split(self, messages: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """(older, recent): `recent` is the newest run of messages that fits the budget.
+
+        The newest message is always kept, even when it alone exceeds the budget.
+        """
+        used = 0
+        start = len(messages)
+        while start > 0 and len(messages) - start < self.max_recent:
+            cost = self.message_tokens(messages[start - 1])
+            if start < len(messages) and used + cost > self.budget:
+                break
+            used += cost
+            start -= 1
+        return messages[:start], messages[start:]
+
+    def pending(self, messages: List[dict], summary_until=None) -> List[dict]:
+        """Messages that have left the verbatim window but are not in the summary yet."""
+        older, _ = self.split(messages)
+        if summary_until is None:
+            return older
+        return [msg for msg in older if msg["timestamp"] > summary_until]
+
+    def summary_prompt(self, summary: Optional[str], messages: List[dict]) -> str:
+        lines = [f"{msg['role']}: {msg['content']}" for msg in messages]
+        previous = summary or "(nothing yet)"
+        return (
+            "You maintain a running summary of a conversation between a user and an AI assistant.\n"
+            f"Current summary:\n{previous}\n\n"
+            "New messages:\n" + "\n".join(lines) + "\n\n"
+            f"Rewrite the summary so it also covers the new messages, in at most {self.summary_words} words. "
+            "Keep names, facts, preferences and open questions; drop small talk. Reply with the summary only."
+        )
@@ -0,0 +1,67 @@
+"""HTTP and reporting helpers shared by client.py, load_generator.py and bench_async.py.
+
+Kept free of imports from those modules, so a mode of the client can use them
+without importing (and running) client.py a second time.
+"""
+
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connect fast, but give the model time to answer
+DEFAULT_TIMEOUT = (3.05, 60)
+# Statuses worth retrying: the backend or a proxy in front of it failed transiently
+RETRY_STATUSES = {500, 502, 503, 504}
+# Methods that are safe to send twice; anything else (POST /chat) is only
+# retried when it cannot have reached the backend
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def make_http_session(pool_size: int = 10) -> requests.Session:
+    """A keep-alive session whose pool can hold `pool_size` connections to the backend."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter, so retrying clients don't stampede together."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def request_with_retries(http: requests.Session, method: str, url: str, retries: int = 3,
+                         timeout=DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """Send a request, retrying failures with jittered backoff.
+
+    Idempotent requests are retried on timeouts, connection errors and 5xx
+    responses. Others only on connection errors (connect timeouts included):
+    after a read timeout or a 5xx the backend may already have handled the
+    message, and sending it again would store it twice.
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    retry_on = ((requests.exceptions.ConnectionError, requests.exceptions.Timeout) if idempotent
+                else requests.exceptions.ConnectionError)
+    for attempt in range(retries + 1):
+        try:
+            response = http.request(method, url, timeout=timeout, **kwargs)
+        except retry_on:
+            if attempt == retries:
+                raise
+        else:
+            if not idempotent or response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            response.close()
+        time.sleep(backoff_delay(attempt))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
@@ -0,0 +1,219 @@
+"""Open-loop load generator for the chat backend.
+
+Simulated users replay scripted dialogues against /chat at a target request
+rate. Each user sends its next message only after the previous reply, the way
+a person would; when its dialogue ends it starts a fresh session with the next
+one. Every request is recorded (latency, outcome, how late it was sent) and
+the run can be written out as CSV or JSON.
+
+Dialogue files are either JSON (a list of dialogues, each a list of messages)
+or plain text with one message per line and a blank line between dialogues.
+
+Run it through the client, e.g. against a local backend with stubs:
+  MONGO_URI=mongomock://localhost USE_STUB_LLM=true python app.py
+  python client.py --load dialogues.json --rate 20 --duration 60 --users 50 --report run.csv
+"""
+
+import csv
+import json
+import queue
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from http_utils import DEFAULT_TIMEOUT, make_http_session, percentile, request_with_retries
+
+DEFAULT_DIALOGUES = [
+    ["Hi! Who are you?", "What can you help me with?", "Tell me a fun fact.", "Thanks, bye!"],
+    ["Can you suggest a book to read?", "Something shorter?", "Why that one?"],
+    ["How do I make a good cup of tea?", "And green tea?", "How long should it steep?"],
+    ["Explain recursion simply.", "Give me an example in Python.", "What is a base case?"],
+]
+
+REPORT_FIELDS = ["sent_at", "user", "session_id", "turn", "latency_ms", "lag_ms", "outcome", "status"]
+
+
+def load_dialogues(path: Optional[str]) -> List[List[str]]:
+    if not path:
+        return DEFAULT_DIALOGUES
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        dialogues = [list(map(str, d)) for d in json.loads(text)]
+    else:
+        dialogues, current = [], []
+        for line in text.splitlines() + [""]:
+            if line.strip():
+                current.append(line.strip())
+            elif current:
+                dialogues.append(current)
+                current = []
+    dialogues = [d for d in dialogues if d]
+    if not dialogues:
+        raise ValueError(f"No dialogues found in {path}")
+    return dialogues
+
+
+class SimulatedUser:
+    """One scripted conversation at a time; moves to a new session when it ends."""
+
+    def __init__(self, index: int, dialogues: List[List[str]], run_id: str):
+        self.index = index
+        self.dialogues = dialogues
+        self.run_id = run_id
+        self.conversations = 0
+        self._start_dialogue()
+
+    def _start_dialogue(self):
+        self.dialogue = self.dialogues[(self.index + self.conversations) % len(self.dialogues)]
+        self.session_id = f"load_{self.run_id}_{self.index}_{self.conversations}"
+        self.turn = 0
+
+    def next_message(self):
+        message = self.dialogue[self.turn]
+        turn = self.turn
+        self.turn += 1
+        if self.turn == len(self.dialogue):
+            self.conversations += 1
+            self._start_dialogue()
+        return turn, message
+
+
+def send_turn(http: requests.Session, base_url: str, session_id: str, message: str,
+              timeout=DEFAULT_TIMEOUT, retries: int = 0):
+    """POST one message; returns (outcome, HTTP status or None)."""
+    try:
+        response = request_with_retries(http, "POST", f"{base_url}/chat", retries, timeout,
+                                        json={"session_id": session_id, "message": message})
+    except requests.exceptions.Timeout:
+        return "timeout", None
+    except requests.exceptions.ConnectionError:
+        return "connection_error", None
+    if response.status_code != 200:
+        return f"http_{response.status_code}", response.status_code
+    try:
+        response.json()["response"]
+    except (ValueError, KeyError):
+        return "bad_response", response.status_code
+    return "ok", response.status_code
+
+
+def run_load(base_url: str, dialogues: List[List[str]], rate: float, duration: float,
+             users: int = 20, timeout=DEFAULT_TIMEOUT, retries: int = 0) -> List[Dict[str, Any]]:
+    """Send requests at `rate` per second for `duration` seconds; returns one record per request.
+
+    A request is sent on schedule by any idle user. When every user is still
+    waiting for a reply the request goes out late, and `lag_ms` records by how
+    much, so an overloaded backend shows up as lag instead of a silently lower rate.
+    """
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    base_url = base_url.rstrip("/")
+    http = make_http_session(pool_size=users)
+    idle = queue.Queue()
+    for i in range(users):
+        idle.put(SimulatedUser(i, dialogues, run_id))
+
+    records = []
+    records_lock = threading.Lock()
+
+    def one(user: SimulatedUser, session_id: str, turn: int, message: str, scheduled: float):
+        sent_at = datetime.now()
+        started = time.perf_counter()
+        try:
+            outcome, status = send_turn(http, base_url, session_id, message, timeout, retries)
+        except Exception as e:
+            outcome, status = type(e).__name__, None
+        finally:
+            idle.put(user)
+        record = {
+            "sent_at": sent_at.isoformat(timespec="milliseconds"),
+            "user": user.index,
+            "session_id": session_id,
+            "turn": turn,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "lag_ms": round((started - scheduled) * 1000, 1),
+            "outcome": outcome,
+            "status": status,
+        }
+        with records_lock:
+            records.append(record)
+
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for i in range(int(rate * duration)):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            user = idle.get()
+            session_id = user.session_id
+            turn, message = user.next_message()
+            pool.submit(one, user, session_id, turn, message, scheduled)
+    http.close()
+    return records
+
+
+def summarize(records: List[Dict[str, Any]], rate: float, elapsed: float) -> Dict[str, Any]:
+    ok = [r["latency_ms"] for r in records if r["outcome"] == "ok"]
+    lags = [r["lag_ms"] for r in records]
+    return {
+        "requests": len(records),
+        "target_rate": rate,
+        "achieved_rate": round(len(records) / elapsed, 2) if elapsed else 0.0,
+        "elapsed_s": round(elapsed, 2),
+        "outcomes": dict(Counter(r["outcome"] for r in records)),
+        "error_rate": round(1 - len(ok) / len(records), 4) if records else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(ok), 1) if ok else 0.0,
+            "p50": percentile(ok, 50),
+            "p90": percentile(ok, 90),
+            "p95": percentile(ok, 95),
+            "p99": percentile(ok, 99),
+            "max": max(ok, default=0.0),
+        },
+        "lag_ms": {"p50": percentile(lags, 50), "p95": percentile(lags, 95), "max": max(lags, default=0.0)},
+    }
+
+
+def write_report(path: str, summary: Dict[str, Any], records: List[Dict[str, Any]]):
+    """CSV gets one row per request; JSON gets the summary plus every request."""
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "requests": records}, f, indent=2)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+
+
+def print_summary(summary: Dict[str, Any]):
+    print(f"\n📊 Load test: {summary['requests']} requests in {summary['elapsed_s']}s")
+    print(f"   Rate:         {summary['achieved_rate']} req/s (target {summary['target_rate']})")
+    print(f"   Error rate:   {summary['error_rate'] * 100:.2f}%")
+    for outcome, count in sorted(summary["outcomes"].items()):
+        print(f"     {outcome}: {count}")
+    for key, value in summary["latency_ms"].items():
+        print(f"   Latency {key}:{' ' * (5 - len(key))}{value:.0f} ms")
+    print(f"   Send lag p95: {summary['lag_ms']['p95']:.0f} ms (max {summary['lag_ms']['max']:.0f} ms)")
+
+
+def main_load(base_url: str, dialogue_file: Optional[str], rate: float, duration: float, users: int,
+              report: Optional[str] = None, timeout=DEFAULT_TIMEOUT, retries: int = 0) -> Dict[str, Any]:
+    dialogues = load_dialogues(dialogue_file)
+    print(f"🚦 {len(dialogues)} dialogues, {users} users, {rate} req/s for {duration}s against {base_url}")
+    started = time.perf_counter()
+    records = run_load(base_url, dialogues, rate, duration, users, timeout=timeout, retries=retries)
+    summary = summarize(records, rate, time.perf_counter() - started)
+    print_summary(summary)
+    if report:
+        write_report(report, summary, records)
+        print(f"   Report:       {report}")
+    return summary
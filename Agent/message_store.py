@@ -0,0 +1,297 @@
+"""Bucketed conversation storage.
+
+Instead of one ever-growing `messages` array per session, messages live in
+fixed-size bucket documents:
+
+    conversations:   {session_id, created_at, summary, summary_until}   one per session
+    message_buckets: {session_id, session_created_at, open, count, first_ts, last_ts, messages: [...]}
+
+Appending touches only the session's single open bucket, which never holds
+more than `bucket_size` messages, so write cost stays flat however long a
+conversation gets. When a bucket cannot take the new messages it is sealed
+and a new one is started.
+
+The session document also holds the rolling summary of messages that have
+left the prompt window (`summary`, `summary_until`).
+
+With a non-zero `ttl`, sessions expire `ttl` seconds after they were created:
+both collections get a TTL index on the session's creation time, so a session
+and all of its buckets are removed together. The default (0) keeps them forever. A partial unique index keeps concurrent
+appends from leaving a session with two open buckets.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+import pymongo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+
+BUCKET_SIZE = 100
+# Session expiry in seconds; 0 (the default) creates no TTL index
+SESSION_TTL = 0
+# Times an append retries after losing the race to open a session's new bucket
+APPEND_ATTEMPTS = 3
+
+BUCKET_INDEXES = [
+    # Finding the open bucket to append to
+    [("session_id", pymongo.ASCENDING), ("open", pymongo.ASCENDING)],
+    # Reading a session newest-first
+    [("session_id", pymongo.ASCENDING), ("first_ts", pymongo.DESCENDING)],
+]
+# At most one open bucket per session: of two writers starting a new bucket at
+# once, the second insert fails and that writer appends to the first one's bucket
+OPEN_BUCKET_INDEX = ([("session_id", pymongo.ASCENDING)],
+                     {"name": "one_open_bucket", "unique": True, "partialFilterExpression": {"open": True}})
+
+
+def _index_specs(store) -> list:
+    """(collection, keys, options) of every index a store needs."""
+    keys, options = OPEN_BUCKET_INDEX
+    specs = [(store.sessions, "session_id", {"unique": True}), (store.buckets, keys, options)]
+    specs += [(store.buckets, keys, {}) for keys in BUCKET_INDEXES]
+    if store.ttl:
+        specs += [(store.sessions, "created_at", {"expireAfterSeconds": store.ttl}),
+                  (store.buckets, "session_created_at", {"expireAfterSeconds": store.ttl})]
+    return specs
+
+
+def _append_query(session_id: str, messages: List[dict], bucket_size: int):
+    return (
+        {"session_id": session_id, "open": True, "count": {"$lte": bucket_size - len(messages)}},
+        {
+            "$push": {"messages": {"$each": messages}},
+            "$inc": {"count": len(messages)},
+            "$set": {"last_ts": messages[-1]["timestamp"]},
+        },
+    )
+
+
+def _new_bucket(session_id: str, messages: List[dict], session_created_at=None):
+    return {
+        "session_id": session_id,
+        "session_created_at": session_created_at,
+        "open": True,
+        "count": len(messages),
+        "first_ts": messages[0]["timestamp"],
+        "last_ts": messages[-1]["timestamp"],
+        "created_at": datetime.utcnow(),
+        "messages": list(messages),
+    }
+
+
+def _session_upsert(session_id: str):
+    return (
+        {"session_id": session_id},
+        {"$setOnInsert": {"session_id": session_id, "created_at": datetime.utcnow()}},
+    )
+
+
+_SESSION_UPSERT_OPTIONS = {"projection": {"created_at": 1}, "upsert": True, "return_document": ReturnDocument.AFTER}
+
+
+_SUMMARY_PROJECTION = {"summary": 1, "summary_until": 1, "_id": 0}
+
+
+def _summary_of(session) -> Optional[dict]:
+    if not session or "summary" not in session:
+        return None
+    return {"text": session["summary"], "until": session["summary_until"]}
+
+
+def _summary_update(session_id: str, text: str, until):
+    # Never replace a summary that already covers more of the conversation
+    return (
+        {"session_id": session_id, "$or": [{"summary_until": {"$exists": False}}, {"summary_until": {"$lt": until}}]},
+        {"$set": {"summary": text, "summary_until": until}},
+    )
+
+
+def _recent_cursor_args(session_id: str, limit: int, bucket_size: int):
+    # Enough buckets to cover `limit` even if the newest one is nearly empty
+    return (
+        {"session_id": session_id},
+        {"messages": {"$slice": -limit}, "_id": 0},
+        limit // bucket_size + 2,
+    )
+
+
+def _after_query(session_id: str, since):
+    # Only buckets holding a message newer than `since` (all of them when it is None)
+    query = {"session_id": session_id}
+    if since is not None:
+        query["last_ts"] = {"$gt": since}
+    return query, {"messages": 1, "_id": 0}
+
+
+def _collect_after(buckets, since) -> List[dict]:
+    return [m for bucket in buckets for m in bucket.get("messages", [])
+            if since is None or m["timestamp"] > since]
+
+
+def _collect_recent(buckets, limit: int) -> List[dict]:
+    messages = []
+    for bucket in buckets:
+        messages = bucket.get("messages", []) + messages
+        if len(messages) >= limit:
+            break
+    return messages[-limit:]
+
+
+def split_into_buckets(session_id: str, messages: List[dict], bucket_size: int = BUCKET_SIZE,
+                       session_created_at=None) -> List[dict]:
+    """Bucket documents for an existing message list; only the last one is left open."""
+    buckets = []
+    for start in range(0, len(messages), bucket_size):
+        bucket = _new_bucket(session_id, messages[start:start + bucket_size], session_created_at)
+        bucket["open"] = False
+        buckets.append(bucket)
+    if buckets:
+        buckets[-1]["open"] = True
+    return buckets
+
+
+class MessageStore:
+    """Bucketed message storage on a synchronous (pymongo) database."""
+
+    def __init__(self, db, bucket_size: int = BUCKET_SIZE, ttl: int = SESSION_TTL):
+        self.sessions = db["conversations"]
+        self.buckets = db["message_buckets"]
+        self.bucket_size = bucket_size
+        self.ttl = ttl
+
+    def ensure_indexes(self):
+        """Create every index; one that fails (say, over duplicate data) doesn't keep
+        the others, such as the TTL indexes, from being created.
+
+        Raises OperationFailure listing the failed indexes afterwards.
+        """
+        errors = []
+        for collection, keys, options in _index_specs(self):
+            try:
+                collection.create_index(keys, **options)
+            except PyMongoError as e:
+                errors.append(f"{collection.name} {keys}: {e}")
+        if errors:
+            raise OperationFailure("; ".join(errors))
+
+    def _ensure_session(self, session_id: str):
+        try:
+            session = self.sessions.find_one_and_update(*_session_upsert(session_id), **_SESSION_UPSERT_OPTIONS)
+        except DuplicateKeyError:
+            # Another request created the session between our match and insert
+            session = self.sessions.find_one({"session_id": session_id}, {"created_at": 1})
+        return session["created_at"]
+
+    def append(self, session_id: str, *messages: dict):
+        messages = list(messages)
+        query, update = _append_query(session_id, messages, self.bucket_size)
+        for attempt in range(APPEND_ATTEMPTS):
+            if self.buckets.update_one(query, update).matched_count:
+                return
+            # No room (or first message of the session): seal and start a new bucket
+            created_at = self._ensure_session(session_id)
+            self.buckets.update_many({"session_id": session_id, "open": True}, {"$set": {"open": False}})
+            try:
+                self.buckets.insert_one(_new_bucket(session_id, messages, created_at))
+                return
+            except DuplicateKeyError:
+                # Another request opened a bucket since our seal; append to that one
+                if attempt == APPEND_ATTEMPTS - 1:
+                    raise
+
+    def recent(self, session_id: str, limit: int) -> List[dict]:
+        query, projection, buckets = _recent_cursor_args(session_id, limit, self.bucket_size)
+        cursor = self.buckets.find(query, projection).sort("first_ts", pymongo.DESCENDING).limit(buckets)
+        return _collect_recent(cursor, limit)
+
+    def session(self, session_id: str):
+        return self.sessions.find_one({"session_id": session_id}, {"_id": 0})
+
+    def summary(self, session_id: str) -> Optional[dict]:
+        return _summary_of(self.sessions.find_one({"session_id": session_id}, _SUMMARY_PROJECTION))
+
+    def set_summary(self, session_id: str, text: str, until):
+        self.sessions.update_one(*_summary_update(session_id, text, until))
+
+    def messages(self, session_id: str) -> List[dict]:
+        cursor = self.buckets.find({"session_id": session_id}, {"messages": 1, "_id": 0}).sort("first_ts", pymongo.ASCENDING)
+        return [m for bucket in cursor for m in bucket.get("messages", [])]
+
+    def messages_after(self, session_id: str, since=None) -> List[dict]:
+        """Messages newer than `since` (e.g. a summary's `until`), oldest first."""
+        cursor = self.buckets.find(*_after_query(session_id, since)).sort("first_ts", pymongo.ASCENDING)
+        return _collect_after(cursor, since)
+
+    def delete(self, session_id: str):
+        self.sessions.delete_one({"session_id": session_id})
+        self.buckets.delete_many({"session_id": session_id})
+
+
+class AsyncMessageStore:
+    """Same layout as MessageStore, on a motor-style async database."""
+
+    def __init__(self, db, bucket_size: int = BUCKET_SIZE, ttl: int = SESSION_TTL):
+        self.sessions = db["conversations"]
+        self.buckets = db["message_buckets"]
+        self.bucket_size = bucket_size
+        self.ttl = ttl
+
+    async def ensure_indexes(self):
+        errors = []
+        for collection, keys, options in _index_specs(self):
+            try:
+                await collection.create_index(keys, **options)
+            except PyMongoError as e:
+                errors.append(f"{collection.name} {keys}: {e}")
+        if errors:
+            raise OperationFailure("; ".join(errors))
+
+    async def _ensure_session(self, session_id: str):
+        try:
+            session = await self.sessions.find_one_and_update(*_session_upsert(session_id), **_SESSION_UPSERT_OPTIONS)
+        except DuplicateKeyError:
+            session = await self.sessions.find_one({"session_id": session_id}, {"created_at": 1})
+        return session["created_at"]
+
+    async def append(self, session_id: str, *messages: dict):
+        messages = list(messages)
+        query, update = _append_query(session_id, messages, self.bucket_size)
+        for attempt in range(APPEND_ATTEMPTS):
+            if (await self.buckets.update_one(query, update)).matched_count:
+                return
+            created_at = await self._ensure_session(session_id)
+            await self.buckets.update_many({"session_id": session_id, "open": True}, {"$set": {"open": False}})
+            try:
+                await self.buckets.insert_one(_new_bucket(session_id, messages, created_at))
+                return
+            except DuplicateKeyError:
+                if attempt == APPEND_ATTEMPTS - 1:
+                    raise
+
+    async def recent(self, session_id: str, limit: int) -> List[dict]:
+        query, projection, buckets = _recent_cursor_args(session_id, limit, self.bucket_size)
+        cursor = self.buckets.find(query, projection).sort("first_ts", pymongo.DESCENDING).limit(buckets)
+        return _collect_recent(await cursor.to_list(length=buckets), limit)
+
+    async def session(self, session_id: str):
+        return await self.sessions.find_one({"session_id": session_id}, {"_id": 0})
+
+    async def summary(self, session_id: str) -> Optional[dict]:
+        return _summary_of(await self.sessions.find_one({"session_id": session_id}, _SUMMARY_PROJECTION))
+
+    async def set_summary(self, session_id: str, text: str, until):
+        await self.sessions.update_one(*_summary_update(session_id, text, until))
+
+    async def messages(self, session_id: str) -> List[dict]:
+        cursor = self.buckets.find({"session_id": session_id}, {"messages": 1, "_id": 0}).sort("first_ts", pymongo.ASCENDING)
+        return [m for bucket in await cursor.to_list(length=None) for m in bucket.get("messages", [])]
+
+    async def messages_after(self, session_id: str, since=None) -> List[dict]:
+        """Messages newer than `since` (e.g. a summary's `until`), oldest first."""
+        cursor = self.buckets.find(*_after_query(session_id, since)).sort("first_ts", pymongo.ASCENDING)
+        return _collect_after(await cursor.to_list(length=None), since)
+
+    async def delete(self, session_id: str):
+        await self.sessions.delete_one({"session_id": session_id})
+        await self.buckets.delete_many({"session_id": session_id})
@@ -0,0 +1,83 @@
+"""Move messages from the old one-array-per-session layout into message buckets.
+
+Each `conversations` document that still has a `messages` array gets its
+messages copied into `message_buckets`, then the array is removed so the
+document only keeps session metadata. Bucket ids are derived from the
+session id, so an interrupted run can simply be started again.
+
+Indexes are created only after every session has been copied, so a TTL or
+unique index cannot delete or reject legacy data mid-migration. Sessions or
+indexes that fail are reported and the script exits non-zero.
+
+Usage:
+  python migrate_conversations.py [--dry-run] [--bucket-size 100]
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from message_store import BUCKET_SIZE, MessageStore, split_into_buckets
+
+
+def migrate_session(store: MessageStore, doc: dict, dry_run: bool = False) -> int:
+    session_id = doc["session_id"]
+    buckets = split_into_buckets(session_id, doc.get("messages", []), store.bucket_size, doc.get("created_at"))
+    # Buckets the new backend already wrote for this session stay the open ones
+    has_live = store.buckets.count_documents({"session_id": session_id, "migrated": {"$ne": True}}) > 0
+    for index, bucket in enumerate(buckets):
+        bucket["_id"] = f"{session_id}:{index:06d}"
+        bucket["migrated"] = True
+        if has_live:
+            bucket["open"] = False
+
+    if not dry_run:
+        if buckets:
+            store.buckets.bulk_write([ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in buckets])
+        store.sessions.update_one({"_id": doc["_id"]}, {"$unset": {"messages": ""}})
+    return len(buckets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate conversations to bucketed message storage")
+    parser.add_argument("--bucket-size", type=int, default=BUCKET_SIZE,
+                        help=f"Messages per bucket (default: {BUCKET_SIZE})")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGO_URI"))
+    store = MessageStore(client["ChatApp"], bucket_size=args.bucket_size)
+
+    sessions = messages = buckets = failed = 0
+    for doc in store.sessions.find({"messages": {"$exists": True}}):
+        try:
+            buckets += migrate_session(store, doc, args.dry_run)
+        except PyMongoError as e:
+            print(f"❌ Session {doc.get('session_id')!r} not migrated: {e}")
+            failed += 1
+            continue
+        sessions += 1
+        messages += len(doc.get("messages", []))
+        if sessions % 100 == 0:
+            print(f"  {sessions} sessions migrated...")
+
+    action = "Would migrate" if args.dry_run else "Migrated"
+    print(f"{action} {sessions} sessions, {messages} messages into {buckets} buckets")
+
+    if not args.dry_run:
+        try:
+            store.ensure_indexes()
+        except PyMongoError as e:
+            print(f"⚠️ Some indexes could not be created: {e}")
+            print("   Fix the data (e.g. duplicate session_id values) and run the script again.")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
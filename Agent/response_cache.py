@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+def cache_key(prompt: List, model: str = "") -> str:
+    """Hash of the whole prompt sent to `model` (LangChain messages), ignoring
+    case and whitespace differences.
+
+    Every message counts, system prompt and summary included, so two turns
+    share a reply only when the model would have seen the same input.
+    """
+    normalized = [
+        (msg.type, " ".join(msg.content.lower().split()))
+        for msg in prompt
+    ]
+    return hashlib.sha256(json.dumps([model, normalized]).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match cache of model replies: an in-memory LRU in front of SQLite.
+
+    Entries expire `ttl` seconds after they were generated. The memory tier
+    holds at most `max_entries` replies; the disk tier (skipped when `path` is
+    empty) drops its least recently used rows once it exceeds `max_bytes`, so
+    hot prompts survive restarts and are shared between worker processes.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 3600.0,
+                 max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, created REAL, accessed REAL, size INTEGER, response TEXT)"
+                )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, response = entry
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return response
+                del self._entries[key]
+
+            row = self._disk_get(key, now) if self._conn else None
+            if row is None:
+                self.misses += 1
+                return None
+            created, response = row
+            self._remember(key, created, response)
+            self.hits["disk"] += 1
+            return response
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            if self._conn:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, created, accessed, size, response) VALUES (?, ?, ?, ?, ?)",
+                        (key, now, now, len(response), response),
+                    )
+                    self._evict(now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits["memory"] + self.hits["disk"]
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _remember(self, key, created, response):
+        self._entries[key] = (created, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_get(self, key, now):
+        with self._conn:
+            row = self._conn.execute("SELECT created, response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[0] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return row
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -1,58 +1,92 @@
 import speech_recognition as sr
 from gtts import gTTS
 import pyttsx3
+import atexit
+import io
 import os
 import tempfile
 import time
-from typing import Optional, Tuple
+from contextlib import ExitStack
+from typing import Callable, Optional, Tuple
+
+# The recognizer backends live in the repository root, shared with Speech-to-text.py;
+# put the root on the import path to use them (PYTHONPATH=.. python client.py --mic)
+from recognizers import GoogleBackend, load_backend
+from streaming_asr import StreamingListener
+from tts_cache import AudioCache
+
+# In-process MP3 playback (optional); without it audio is handed to the OS player
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+try:
+    import pygame
+    PYGAME_AVAILABLE = True
+except ImportError:
+    PYGAME_AVAILABLE = False
 
 class SpeechHandler:    
     """Handles speech recognition and text-to-speech operations."""
     
-    def __init__(self, use_offline_tts: bool = False):
+    def __init__(self, use_offline_tts: bool = False, recognizer_backend: Optional[str] = None,
+                 streaming: bool = True, tts_cache: bool = True):
         self.use_offline_tts = use_offline_tts
         self.recognizer = sr.Recognizer()
+        self.calibrated = False
+        self._last_audio_file = None
+        # Switched off when the mixer fails (no audio device), so later replies go to the OS player
+        self.use_pygame = PYGAME_AVAILABLE
+        atexit.register(self.close)
+
+        # Synthesized phrases are kept on disk (TTS_CACHE_DIR), so repeats play without a request
+        self.tts_cache = None
+        if tts_cache:
+            try:
+                self.tts_cache = AudioCache()
+            except OSError as e:
+                print(f"TTS cache disabled: {e}")
+
+        # Load the recognition model once, here, rather than on every utterance
+        try:
+            self.backend = load_backend(recognizer_backend)
+            print(f"Speech recognition backend: {self.backend.name}")
+        except Exception as e:
+            print(f"Failed to load speech recognition backend: {e}")
+            print("Falling back to Google speech recognition")
+            self.backend = GoogleBackend()
+        # Frame-level VAD capture that recognises while the user is still speaking
+        self.listener = StreamingListener(self.backend) if streaming else None
         
         # Initialize TTS engine
+        self.tts_engine = None
         if use_offline_tts:
-            try:
-                self.tts_engine = pyttsx3.init()
-                # Configure voice properties
-                voices = self.tts_engine.getProperty('voices')
-                if voices:
-                    self.tts_engine.setProperty('voice', voices[0].id)
-                self.tts_engine.setProperty('rate', 150)
-                self.tts_engine.setProperty('volume', 0.9)
-                print("Offline TTS engine initialized successfully")
-            except Exception as e:
-                print(f"Failed to initialize offline TTS: {e}")
-                print("Falling back to online TTS")
-                self.use_offline_tts = False
+            self.init_offline_tts()
         else:
-            self.tts_engine = None
             print("Online TTS (gTTS) will be used")
+
+    def init_offline_tts(self):
+        """Set up pyttsx3; falls back to online TTS if that fails."""
+        try:
+            self.tts_engine = pyttsx3.init()
+            # Configure voice properties
+            voices = self.tts_engine.getProperty('voices')
+            if voices:
+                self.tts_engine.setProperty('voice', voices[0].id)
+            self.tts_engine.setProperty('rate', 150)
+            self.tts_engine.setProperty('volume', 0.9)
+            print("Offline TTS engine initialized successfully")
+        except Exception as e:
+            print(f"Failed to initialize offline TTS: {e}")
+            print("Falling back to online TTS")
+            self.use_offline_tts = False
     
-    def listen_to_mic(self, timeout: int = 5, phrase_time_limit: int = 10) -> Tuple[bool, str]:
+    def listen_to_mic(self, timeout: int = 5, phrase_time_limit: int = 10,
+                      on_partial: Optional[Callable[[str], None]] = None) -> Tuple[bool, str]:
         try:
-            with sr.Microphone() as source:
-                print("Listening... (speak now)")
-                
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Listen for audio input
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout, 
-                    phrase_time_limit=phrase_time_limit
-                )
-                
-                print("Processing speech...")
-                
-                # Use Google's speech recognition (requires internet)
-                text = self.recognizer.recognize_google(audio)
-                print(f"Recognized: {text}")
-                return True, text
+            if self.listener is not None:
+                text = self._listen_streaming(timeout, phrase_time_limit, on_partial)
+            else:
+                text = self._listen_phrase(timeout, phrase_time_limit)
+            print(f"Recognized: {text}")
+            return True, text
                 
         except sr.WaitTimeoutError:
             return False, "No speech detected within timeout period"
@@ -63,6 +97,39 @@ class SpeechHandler:
         except Exception as e:
             return False, f"Error during speech recognition: {e}"
     
+    def _listen_streaming(self, timeout, phrase_time_limit, on_partial) -> str:
+        with ExitStack() as stack:
+            try:
+                source = stack.enter_context(self.listener.microphone())
+            except OSError as e:
+                # Some devices can't capture at 16 kHz; record whole phrases instead
+                print(f"Streaming capture unavailable ({e}), recording whole phrases")
+                self.listener = None
+                return self._listen_phrase(timeout, phrase_time_limit)
+            print("Listening... (speak now)")
+            return self.listener.listen(source, timeout, phrase_time_limit, on_partial)
+
+    def _listen_phrase(self, timeout, phrase_time_limit) -> str:
+        with sr.Microphone() as source:
+            print("Listening... (speak now)")
+
+            # Measure ambient noise once; the recognizer's dynamic threshold tracks it afterwards
+            if not self.calibrated:
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                self.calibrated = True
+
+            # Listen for audio input
+            audio = self.recognizer.listen(
+                source,
+                timeout=timeout,
+                phrase_time_limit=phrase_time_limit
+            )
+
+            print("Processing speech...")
+
+            # Google (online) or a local model, depending on the backend
+            return self.backend.transcribe(audio)
+
     def speak_text(self, text: str) -> bool:
         try:
             if self.use_offline_tts and self.tts_engine:
@@ -78,35 +145,68 @@ class SpeechHandler:
             print(f"Error in TTS: {e}")
             return False
     
+    def synthesize(self, text: str, lang: str = 'en', tld: str = 'com', slow: bool = False) -> bytes:
+        """MP3 audio for `text`, from the cache when this phrase was spoken before."""
+        key = AudioCache.key("gtts", text, lang=lang, tld=tld, slow=slow)
+        audio = self.tts_cache.get(key) if self.tts_cache else None
+        if audio is None:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=lang, tld=tld, slow=slow).write_to_fp(buffer)
+            audio = buffer.getvalue()
+            if self.tts_cache:
+                self.tts_cache.put(key, audio)
+        return audio
+
     def _speak_with_gtts(self, text: str) -> bool:
         try:
-            # Create temporary file for audio
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                temp_filename = temp_file.name
-            
-            # Generate speech
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(temp_filename)
-            
-            # Play audio (platform-specific)
-            if os.name == 'nt':  # Windows
-                os.system(f'start {temp_filename}')
-            elif os.name == 'posix':  # macOS and Linux
-                os.system(f'open {temp_filename}' if os.uname().sysname == 'Darwin' else f'xdg-open {temp_filename}')
-            
-            # Clean up after a delay
-            time.sleep(0.5)
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
-                
+            self.play_mp3(self.synthesize(text))
             return True
             
         except Exception as e:
             print(f"Error with gTTS: {e}")
             return False
+
+    def play_mp3(self, audio: bytes):
+        """Play MP3 bytes in-process and wait for the end; hands off to the OS player without pygame."""
+        if self.use_pygame:
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+                pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+                pygame.mixer.music.play()
+                while pygame.mixer.music.get_busy():
+                    time.sleep(0.02)
+                return
+            except pygame.error as e:
+                print(f"In-process playback unavailable ({e}), using the system player")
+                self.use_pygame = False
+
+        # The external player may still be reading the previous file, so it is
+        # only removed once the next one is written (or at exit, see close())
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
+            temp_file.write(audio)
+            temp_filename = temp_file.name
+        self._remove_last_audio_file()
+        self._last_audio_file = temp_filename
+
+        # Play audio (platform-specific)
+        if os.name == 'nt':  # Windows
+            os.system(f'start {temp_filename}')
+        elif os.name == 'posix':  # macOS and Linux
+            os.system(f'open {temp_filename}' if os.uname().sysname == 'Darwin' else f'xdg-open {temp_filename}')
     
+    def _remove_last_audio_file(self):
+        if self._last_audio_file:
+            try:
+                os.unlink(self._last_audio_file)
+            except OSError:
+                pass
+            self._last_audio_file = None
+
+    def close(self):
+        """Remove the temp file of the last reply played by the OS player (also run at exit)."""
+        self._remove_last_audio_file()
+
     def test_microphone(self) -> bool:
         try:
             with sr.Microphone() as source:
@@ -0,0 +1,114 @@
+"""Local stand-ins for the LLM and MongoDB, for benchmarks and offline runs.
+
+Nothing here talks to an external service: the chat model answers after a
+configurable delay and the Mongo stand-in is mongomock wrapped in a
+motor-style async API.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import mongomock
+
+
+class StubChatModel:
+    """Mimics the parts of a LangChain chat model that the backend uses."""
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+
+    def _reply(self, messages) -> str:
+        last = messages[-1].content if messages else ""
+        return f"Stub reply to: {last[:80]}"
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return SimpleNamespace(content=self._reply(messages))
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=self._reply(messages))
+
+    def _tokens(self, messages):
+        words = self._reply(messages).split(" ")
+        return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+    def stream(self, messages):
+        tokens = self._tokens(messages)
+        for token in tokens:
+            time.sleep(self.latency / len(tokens))
+            yield SimpleNamespace(content=token)
+
+    async def astream(self, messages):
+        tokens = self._tokens(messages)
+        for token in tokens:
+            await asyncio.sleep(self.latency / len(tokens))
+            yield SimpleNamespace(content=token)
+
+
+class AsyncCursor:
+    """motor-style cursor: chainable sort/limit, awaited to_list."""
+
+    def __init__(self, cursor, latency: float = 0.0):
+        self._cursor = cursor
+        self._latency = latency
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, *args):
+        self._cursor = self._cursor.limit(*args)
+        return self
+
+    async def to_list(self, length=None):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        items = list(self._cursor)
+        return items if length is None else items[:length]
+
+
+class AsyncCollection:
+    """motor-style async facade over a synchronous (mongomock) collection."""
+
+    def __init__(self, collection, latency: float = 0.0):
+        self._collection = collection
+        self._latency = latency
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs), self._latency)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            if self._latency:
+                await asyncio.sleep(self._latency)
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncDatabase:
+    def __init__(self, database, latency: float = 0.0):
+        self._database = database
+        self._latency = latency
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._database[name], self._latency)
+
+    async def command(self, *args, **kwargs):
+        return self._database.command(*args, **kwargs)
+
+
+class AsyncMongoClient:
+    """Drop-in for motor's AsyncIOMotorClient backed by an in-memory mongomock client."""
+
+    def __init__(self, latency: float = 0.0):
+        self._client = mongomock.MongoClient()
+        self._latency = latency
+        self.admin = AsyncDatabase(self._client.admin)
+
+    def __getitem__(self, name):
+        return AsyncDatabase(self._client[name], self._latency)
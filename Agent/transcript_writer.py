@@ -0,0 +1,122 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+_CLOSE = object()
+
+
+class TranscriptWriter:
+    """Appends conversation turns to a file from a background thread.
+
+    `write` only queues the turn, so saving never blocks the chat loop. The
+    thread keeps the file open, writes whatever has queued up in one go and
+    flushes at most every `flush_interval` seconds (and whenever it goes
+    idle); `close`, which also runs at exit, drains the queue first. Files
+    ending in .jsonl get one JSON object per turn, anything else the
+    plain-text layout. With `rotate_bytes` set, a file that grows past it is
+    renamed with a timestamp and gzipped, and a new one started.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, rotate_bytes: Optional[int] = None):
+        self.path = path
+        self.jsonl = path.endswith((".jsonl", ".ndjson"))
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._file = None
+        self._dirty = False
+        self._last_flush = 0.0
+        self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, user_msg: str, ai_msg: str, session_id: Optional[str] = None):
+        self._queue.put((datetime.now(), session_id, user_msg, ai_msg))
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        atexit.unregister(self.close)
+
+    def _format(self, timestamp, session_id, user_msg, ai_msg) -> str:
+        if self.jsonl:
+            return json.dumps({
+                "timestamp": timestamp.isoformat(timespec="seconds"),
+                "session_id": session_id,
+                "user": user_msg,
+                "ai": ai_msg,
+            }, ensure_ascii=False) + "\n"
+        stamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        return f"[{stamp}] User: {user_msg}\n[{stamp}] AI: {ai_msg}\n" + "-" * 50 + "\n"
+
+    def _run(self):
+        closing = False
+        while not closing:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self._flush()
+                continue
+            # Take everything else that is already waiting, so a burst is one write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _CLOSE in batch:
+                closing = True
+                batch = [item for item in batch if item is not _CLOSE]
+            if batch:
+                self._write_batch(batch)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _flush(self):
+        if self._file and self._dirty:
+            try:
+                self._file.flush()
+            except OSError as e:
+                self.errors += 1
+                print(f"⚠️  Failed to save to file: {e}")
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+    def _write_batch(self, batch):
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(self._format(*item) for item in batch))
+            self._dirty = True
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+            if self.rotate_bytes and self._file.tell() >= self.rotate_bytes:
+                self._rotate()
+        except OSError as e:
+            self.errors += 1
+            print(f"⚠️  Failed to save to file: {e}")
+
+    def _rotate(self):
+        self._file.close()
+        self._dirty = False
+        self._file = None
+        base, ext = os.path.splitext(self.path)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        rotated = f"{base}.{stamp}{ext}"
+        n = 1
+        while os.path.exists(rotated + ".gz"):
+            rotated = f"{base}.{stamp}-{n}{ext}"
+            n += 1
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
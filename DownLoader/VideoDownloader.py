@@ -1,97 +1,22 @@
-import yt_dlp
-import ffmpeg
-import os
-
-
-def readable_size(size_bytes):
-    if not size_bytes:
-        return "Unknown"
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.2f} PB"
+"""Interactive YouTube/Instagram downloader.
 
+Uses the format table engine of the media_downloader package, so run it from
+the repository root as a module:
 
-def is_reasonable(filesize, height):
-    if not filesize or not height:
-        return False
+    python -m DownLoader.VideoDownloader
+"""
 
-    expected_min = {
-        144: 0.5, 240: 1, 360: 2, 480: 3,
-        720: 5, 1080: 8, 1440: 12, 2160: 20
-    }
+import yt_dlp
+import ffmpeg
+import os
 
-    resolution_keys = sorted(expected_min.keys())
-    for res in reversed(resolution_keys):
-        if height >= res:
-            return filesize >= expected_min[res] * 1024 * 1024
-    return filesize >= 2 * 1024 * 1024
+from media_downloader.format_table import classify_formats, print_formats, valid_format_ids
 
 
 def sort_and_print_formats(formats):
-    allowed_video_audio = []
-    blocked_video_audio = []
-    video_only_all = {}
-    audio_only_all = []
-
-    for f in formats:
-        fmt_id = f.get("format_id")
-        vcodec = f.get("vcodec")
-        acodec = f.get("acodec")
-        width = f.get("width") or 0
-        height = f.get("height") or 0
-        filesize = f.get("filesize") or f.get("filesize_approx")
-        ext = f.get("ext", "unknown")
-        format_note = f.get("format_note", "").lower()
-
-        if not fmt_id or not filesize:
-            continue
-
-        info = {
-            "id": fmt_id,
-            "ext": ext,
-            "res": f"{width}x{height}" if width and height else format_note,
-            "height": height,
-            "width": width,
-            "filesize": filesize,
-            "size_str": readable_size(filesize),
-            "format_note": format_note
-        }
-
-        if vcodec != "none" and acodec != "none":
-            if is_reasonable(filesize, height):
-                allowed_video_audio.append(info)
-            else:
-                blocked_video_audio.append(info)
-        elif vcodec != "none":
-            resolution_key = f"{width}x{height}"
-            prev = video_only_all.get(resolution_key)
-            if not prev or filesize > prev["filesize"]:
-                video_only_all[resolution_key] = info
-        elif acodec != "none":
-            if "low" in format_note or "tiny" in format_note:
-                continue
-            audio_only_all.append(info)
-
-    allowed_video_audio.sort(key=lambda x: x["height"], reverse=True)
-    blocked_video_audio.sort(key=lambda x: x["height"], reverse=True)
-    video_only = list(video_only_all.values())
-    video_only.sort(key=lambda x: x["height"], reverse=True)
-    audio_only_all.sort(key=lambda x: x["filesize"], reverse=True)
-
-    def printer(title, lst, blocked=False):
-        status = " (Not downloadable)" if blocked else ""
-        print(f"\n🔹 {title}{status} ({len(lst)} formats):")
-        for f in lst:
-            print(f"[{f['id']}] {f['res']} - {f['ext']} - {f['size_str']}")
-
-    printer("Video + Audio (Allowed)", allowed_video_audio)
-    printer("Video + Audio (Blocked)", blocked_video_audio, blocked=True)
-    printer("Video Only", video_only)
-    printer("Audio Only", audio_only_all)
-
-    return [f["id"] for f in allowed_video_audio + video_only + audio_only_all]
+    classes = classify_formats(formats)
+    print_formats(classes, bullet="🔹")
+    return valid_format_ids(classes)
 
 
 def downloader(link):
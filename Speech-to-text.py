@@ -1,40 +1,108 @@
-import speech_recognition as SR
-from langdetect import detect_langs
-from gtts import gTTS
+import argparse
 import os
-from tkinter import Tk, filedialog, simpledialog
+import sys
+from contextlib import ExitStack
+
+# Tk, gTTS, speech_recognition and the recognizer models are imported where
+# they are used: importing this module is instant, works on machines without
+# a display, and batch workers only pay for what they call.
+
+# Recognition backend (SPEECH_BACKEND=google|vosk|whisper) and its streaming
+# listener, created on first use and kept for the whole session
+_listener = None
+# One hidden Tk root shared by every dialog, created on first use
+_tk_root = None
+
+SAVE_FORMATS = {
+    ".mp3": "speech via Google TTS",
+    ".wav": "speech via the offline system voice",
+    ".txt": "plain text",
+}
+
+
+def speech_listener():
+    global _listener
+    if _listener is None:
+        from recognizers import load_backend
+        from streaming_asr import StreamingListener
+        _listener = StreamingListener(load_backend())
+    return _listener
 
 
 # ------------------ Saver ------------------
-def speech_saver(script):
-    """Save given text as MP3 or TXT file depending on user dialog."""
-    saved_file = get_save_path_gui_file()
-    if not saved_file:
-        return False
+def save_script(script, path, lang=None):
+    """Save text to `path`, in the format its extension names (see SAVE_FORMATS).
 
-    if saved_file.endswith(".mp3"):
-        speech = gTTS(text=script)
-        speech.save(saved_file)
-    elif saved_file.endswith(".txt"):
-        with open(saved_file, "w", encoding="utf-8") as f:
+    Speech is in `lang` (a gTTS language), detected from the text when not
+    given. Raises ValueError for an unsupported extension.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SAVE_FORMATS:
+        raise ValueError(f"Unsupported output format '{ext}' (use {', '.join(SAVE_FORMATS)})")
+
+    if ext == ".txt":
+        with open(path, "w", encoding="utf-8") as f:
             f.write(script)
+        return path
+
+    from tts_batch import CHUNK_CHARS, GTTSEngine, load_engine, synthesize_text
+    if ext == ".wav":
+        engine = load_engine("pyttsx3")
     else:
-        return False
+        from language_detection import detect_tts_language
+        engine = GTTSEngine(lang=lang or detect_tts_language(script))
+    if ext == ".mp3" and len(script) <= CHUNK_CHARS:
+        from gtts import gTTS
+        gTTS(text=script, lang=engine.lang).save(path)
+    else:
+        # Long texts go sentence by sentence on parallel workers and resume after a failure
+        synthesize_text(script, path, engine,
+                        progress=lambda done, total: print(f"\r🔊 {done}/{total} chunks", end="", flush=True))
+        print()
+    return path
 
+
+def speech_saver(script, lang=None, path=None):
+    """Save given text as MP3, WAV or TXT; asks for the file when `path` is not given."""
+    saved_file = path or get_save_path_gui_file()
+    if not saved_file:
+        return False
+    try:
+        save_script(script, saved_file, lang)
+    except Exception as e:
+        print(f"❌ Could not save {os.path.basename(saved_file)}: {e}")
+        return False
     return True
 
 
 # ------------------ Microphone ------------------
+def record_phrase(backend):
+    """Record one whole phrase at the microphone's own rate and recognise it with `backend`."""
+    import speech_recognition as SR
+    recognizer = SR.Recognizer()
+    with SR.Microphone() as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        audio = recognizer.listen(source)
+    print("🔄 Processing...")
+    return backend.transcribe(audio)
+
+
 def mic_user():
     """Capture audio from mic and return recognized text."""
-    recognizer = SR.Recognizer()
+    import speech_recognition as SR
     try:
-        with SR.Microphone() as source:
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = recognizer.listen(source)
-
-            print("🔄 Processing...")
-            text = recognizer.recognize_google(audio)
+        listener = speech_listener()
+        with ExitStack() as stack:
+            try:
+                source = stack.enter_context(listener.microphone())
+            except OSError as e:
+                # Some devices can't capture at 16 kHz; record the whole phrase instead
+                print(f"⚠️ Streaming capture unavailable ({e}), recording the whole phrase")
+                return record_phrase(listener.backend)
+            # Noise is calibrated on the first call only; partial text shows while speaking
+            text = listener.listen(source, timeout=None, phrase_time_limit=None,
+                                   on_partial=lambda partial: print(f"\r🔄 {partial}", end="", flush=True))
+            print()
             return text
     except SR.UnknownValueError:
         print("❌ Could not understand the audio")
@@ -46,35 +114,60 @@ def mic_user():
 
 
 # ------------------ STS ------------------
-def speech_to_speech():
+def speech_to_speech(output=None):
     """Convert speech input directly into speech output (mic → mp3)."""
+    from language_detection import detect_languages, detect_tts_language
     print("🎙 Speak now...")
     text = mic_user()
     if not text:
         return False
     print("✅ You said:", text)
-    print("🌍 Language detected:", detect_langs(text))
-    return speech_saver(text)
+    print("🌍 Language detected:", detect_languages(text))
+    # Detection is cached, so choosing the voice from it costs nothing extra
+    return speech_saver(text, detect_tts_language(text), output)
 
 
 # ------------------ File dialog ------------------
+def tk_root():
+    """The shared hidden Tk root, or None when there is no display to open dialogs on."""
+    global _tk_root
+    if _tk_root is None:
+        try:
+            from tkinter import Tk, TclError
+        except ImportError:
+            return None
+        try:
+            _tk_root = Tk()
+        except TclError:
+            return None
+        _tk_root.withdraw()
+        _tk_root.attributes("-topmost", True)
+    return _tk_root
+
+
+def ask_path(prompt):
+    """Console stand-in for a file dialog on headless machines."""
+    path = input(f"{prompt}: ").strip().strip('"')
+    return os.path.abspath(path) if path else None
+
+
 def get_save_path_gui_file(default_name="output"):
-    """GUI save dialog for choosing mp3/txt output file."""
-    root = Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
+    """GUI save dialog for choosing mp3/wav/txt output file."""
+    if tk_root() is None:
+        return ask_path(f"Save as ({'/'.join(ext[1:] for ext in SAVE_FORMATS)})")
+    from tkinter import filedialog, simpledialog
 
     file_type = simpledialog.askstring(
         "Choose file type",
-        "Enter file type (mp3 or txt):"
+        "Enter file type (mp3, wav or txt):"
     )
     if not file_type:
         return None
 
     file_type = file_type.strip().lower()
-    if file_type == "mp3":
-        def_ext = ".mp3"
-        types = [("MP3 files", "*.mp3")]
+    if file_type in ("mp3", "wav"):
+        def_ext = "." + file_type
+        types = [(f"{file_type.upper()} files", "*" + def_ext)]
         title = "Save audio as..."
     elif file_type == "txt":
         def_ext = ".txt"
@@ -95,17 +188,24 @@ def get_save_path_gui_file(default_name="output"):
     return os.path.abspath(file_path)
 
 
+def get_open_path_gui_file(title, filetypes):
+    if tk_root() is None:
+        return ask_path(title)
+    from tkinter import filedialog
+    return filedialog.askopenfilename(title=title, filetypes=filetypes)
+
+
+def get_directory_gui(title):
+    if tk_root() is None:
+        return ask_path(title)
+    from tkinter import filedialog
+    return filedialog.askdirectory(title=title)
+
+
 # ------------------ TTS ------------------
-def text_to_speech():
-    """Convert a text file to speech (txt → mp3)."""
-    root = Tk()
-    root.withdraw()
-    root.attributes("-topmost", True)
-
-    txt_file = filedialog.askopenfilename(
-        title="Select text file",
-        filetypes=[("Text files", "*.txt")]
-    )
+def text_to_speech(txt_file=None, output=None, lang=None):
+    """Convert a text file to speech (txt → mp3/wav); asks for the files that are not given."""
+    txt_file = txt_file or get_open_path_gui_file("Select text file", [("Text files", "*.txt")])
     if not txt_file or not os.path.exists(txt_file):
         print("❌ No file selected or file does not exist")
         return False
@@ -117,42 +217,107 @@ def text_to_speech():
             print("⚠️ The file is empty")
             return False
 
-        return speech_saver(script)
+        return speech_saver(script, lang, output)
 
     except Exception as e:
-        print(f"❌ Error reading file: {e}")
+        print(f"❌ Text to speech failed: {e}")
+        return False
+
+
+# ------------------ Batch TTS ------------------
+def batch_text_to_speech():
+    """Convert every .txt file in a folder to speech (folder → folder of audio)."""
+    from tts_batch import ENGINES, load_engine, synthesize_directory
+
+    folder = get_directory_gui("Select folder of text files")
+    if not folder:
+        print("❌ No folder selected")
         return False
+    out_dir = get_directory_gui("Select output folder") or folder
+
+    engine_name = input(f"Engine ({'/'.join(ENGINES)}) [gtts]: ").strip().lower() or "gtts"
+    try:
+        engine = load_engine(engine_name)
+    except (ValueError, ImportError) as e:
+        print(f"❌ {e}")
+        return False
+
+    totals = synthesize_directory(folder, out_dir, engine)
+    print(f"✅ {totals['files']} converted, {totals['skipped']} skipped (done or empty), {totals['failed']} failed "
+          f"({totals['chunks']} chunks in {totals['seconds']}s)")
+    return totals["failed"] == 0
 
 
 # ------------------ STT ------------------
-def speech_to_text():
-    """Convert speech input to text and optionally save as txt."""
+def speech_to_text(output=None):
+    """Convert speech input to text and optionally save it; returns the text.
+
+    Returns None when nothing was recognised, or when `output` was given and
+    saving to it failed.
+    """
+    from language_detection import detect_languages
     print("🎙 Speak now...")
     text = mic_user()
     if not text:
         return None
     print("✅ You said:", text)
-    print("🌍 Language detected:", detect_langs(text))
+    print("🌍 Language detected:", detect_languages(text))
 
     # Ask user if they want to save transcript
-    if speech_saver(text):
+    if speech_saver(text, path=output):
         print("✅ Transcript saved successfully")
     else:
         print("⚠️ Transcript not saved")
+        if output:
+            return None
 
     return text
 
 
+# ------------------ Batch STT ------------------
+def batch_speech_to_text():
+    """Transcribe every recording in a folder (folder of audio → txt/srt/jsonl)."""
+    from batch_transcribe import find_audio, print_totals, transcribe_files
+
+    folder = get_directory_gui("Select folder of recordings")
+    if not folder:
+        print("❌ No folder selected")
+        return False
+    files = find_audio([folder])
+    if not files:
+        print("❌ No audio files in that folder")
+        return False
+
+    print(f"🎧 Transcribing {len(files)} files...")
+    try:
+        totals = transcribe_files(files)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return False
+    print_totals(totals)
+    return totals["failed"] == 0
+
+
 # ------------------ Main ------------------
-def main():
+def menu():
+    # Load the recognition model and language profiles up front so the first utterance isn't slowed down
+    from language_detection import preload
+    preload()
+    try:
+        speech_listener()
+    except Exception as e:
+        print(f"⚠️ Speech recognition backend unavailable: {e}")
+
     while True:
         print("\n🎙️ Voice/Text Converter Menu")
         print("1. Speech → Text (STT)")
         print("2. Text → Speech (TTS)")
         print("3. Speech → Speech (STS)")
-        print("4. Exit")
+        print("4. Folder of Text → Speech (batch TTS)")
+        print("5. Folder of Recordings → Text (batch STT)")
+        print("6. Exit")
 
-        choice = input("Enter your choice (1–4): ").strip()
+        choice = input("Enter your choice (1–6): ").strip()
 
         if choice == "1":
             speech_to_text()
@@ -161,11 +326,54 @@ def main():
         elif choice == "3":
             speech_to_speech()
         elif choice == "4":
+            batch_text_to_speech()
+        elif choice == "5":
+            batch_speech_to_text()
+        elif choice == "6":
             print("\n👋 Exiting...")
             break
         else:
             print("❌ Invalid choice. Please try again.")
 
 
+def main(argv=None):
+    """Without arguments, the interactive menu; with a command, runs it without any dialogs."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return menu()
+    # The batch modes have their own command lines
+    if argv[0] == "batch-tts":
+        from tts_batch import main as batch_tts_main
+        return batch_tts_main(argv[1:])
+    if argv[0] == "batch-stt":
+        from batch_transcribe import main as batch_stt_main
+        return batch_stt_main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Voice/Text converter. Run without arguments for the menu; "
+                    "'batch-tts' and 'batch-stt' take their own options.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    formats = ", ".join(SAVE_FORMATS)
+    tts = sub.add_parser("tts", help="Text file → speech")
+    tts.add_argument("input", help="Text file to read")
+    tts.add_argument("-o", "--output", required=True, help=f"Output file ({formats})")
+    tts.add_argument("--lang", help="gTTS language (default: detected from the text)")
+    stt = sub.add_parser("stt", help="Microphone → text")
+    stt.add_argument("-o", "--output", required=True, help=f"Output file ({formats})")
+    sts = sub.add_parser("sts", help="Microphone → speech")
+    sts.add_argument("-o", "--output", required=True, help=f"Output file ({formats})")
+    args = parser.parse_args(argv)
+
+    if os.path.splitext(args.output)[1].lower() not in SAVE_FORMATS:
+        parser.error(f"--output must end in one of: {formats}")
+    if args.command == "tts":
+        ok = text_to_speech(args.input, args.output, args.lang)
+    elif args.command == "stt":
+        ok = speech_to_text(args.output) is not None
+    else:
+        ok = speech_to_speech(args.output)
+    sys.exit(0 if ok else 1)
+
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -1,21 +1,184 @@
 import ffmpeg
+import os
+import sys
+import csv
+import time
+import shutil
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-#Exisiting name of the video file 
-input_video = input("Enter video file name: ")
-input_video += '.mp4'
-vid = ffmpeg.input(input_video)
+# Audio codecs the mp4 muxer accepts as-is, so they can be stream-copied
+MP4_COPY_AUDIO = {"aac", "mp3", "alac", "ac3", "eac3", "opus"}
+MEDIA_EXTS = {".mp4", ".m4a", ".webm", ".mp3", ".mkv", ".opus", ".aac"}
 
 
-#Existing name of audio file
-input_audio = input("Enter audio file name ")
-input_audio += '.mp3'
-aud = ffmpeg.input(input_audio)
+def probe(path):
+    """Return (video codec, audio codec, quality) of a file, None for a missing stream.
 
-#Custom name for merged file
-file_name = input("Name for the file: ")
-file_name += '.mp4'
-try:
-  ffmpeg.output(vid, aud, file_name, vcodec='copy', acodec='aac', strict='experimental').run()
-except Exception as e:
-  print(f"{e}")
+    Quality ranks files of the same title: the pixel count of the video
+    stream, or the bit rate of an audio-only file.
+    """
+    info = ffmpeg.probe(path)
+    streams = info.get("streams", [])
+    video = next((s for s in streams
+                  if s.get("codec_type") == "video" and not s.get("disposition", {}).get("attached_pic")), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video:
+        quality = int(video.get("width") or 0) * int(video.get("height") or 0)
+    elif audio:
+        quality = int(audio.get("bit_rate") or info.get("format", {}).get("bit_rate") or 0)
+    else:
+        quality = 0
+    return video and video["codec_name"], audio and audio["codec_name"], quality
 
+
+def format_suffix_key(stem):
+    """'<title>_<format id>' as written by Downloader.py -> '<title>', else None."""
+    title, sep, fmt = stem.rpartition("_")
+    return title if sep and title and fmt and " " not in fmt else None
+
+
+def find_pairs(folder, probes):
+    """Match video-only and audio-only files in `folder`.
+
+    Files sharing a stem ('clip.mp4' + 'clip.mp3') are paired first, then
+    files sharing a title under the '%(title)s_<format id>' naming that
+    Downloader.py uses. When a title has several candidates, the highest
+    resolution video and highest bit rate audio are used. Returns
+    (output name, video path, audio path).
+    """
+    def best(names):
+        return max(names, key=lambda n: probes[n][2])
+
+    def split(names):
+        video = [n for n in names if probes[n][0] and not probes[n][1]]
+        audio = [n for n in names if probes[n][1] and not probes[n][0]]
+        return video, audio
+
+    by_stem = {}
+    for name in sorted(probes):
+        by_stem.setdefault(os.path.splitext(name)[0], []).append(name)
+
+    pairs = []
+    leftovers = {}
+    for stem, names in by_stem.items():
+        video, audio = split(names)
+        if video and audio:
+            pairs.append((stem + "_merged.mp4", best(video), best(audio)))
+            continue
+        title = format_suffix_key(stem)
+        if title:
+            leftovers.setdefault(title, []).extend(names)
+    for title, names in leftovers.items():
+        video, audio = split(names)
+        if video and audio:
+            pairs.append((title + ".mp4", best(video), best(audio)))
+    return [(out, os.path.join(folder, v), os.path.join(folder, a)) for out, v, a in sorted(pairs)]
+
+
+def merge(video, audio, output, acodec=None, overwrite=False, quiet=False):
+    """Mux video + audio into output, copying audio when the mp4 container allows it.
+
+    Without `overwrite` ffmpeg asks before replacing an existing output;
+    `quiet` hides its console output.
+    """
+    copy_audio = acodec in MP4_COPY_AUDIO
+    out = ffmpeg.output(
+        ffmpeg.input(video).video, ffmpeg.input(audio).audio, output,
+        vcodec='copy', acodec='copy' if copy_audio else 'aac', strict='experimental'
+    )
+    out.run(overwrite_output=overwrite, quiet=quiet)
+    return copy_audio
+
+
+def batch_merge(folder, outdir=None, workers=None):
+    """Merge every video/audio pair in `folder`, running `workers` ffmpeg processes at once."""
+    outdir = outdir or folder
+    os.makedirs(outdir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    names = [n for n in os.listdir(folder)
+             if os.path.splitext(n)[1].lower() in MEDIA_EXTS and os.path.isfile(os.path.join(folder, n))]
+
+    def probe_one(name):
+        try:
+            return name, probe(os.path.join(folder, name))
+        except (ffmpeg.Error, OSError):
+            return name, (None, None, 0)
+
+    def merge_one(pair):
+        out_name, video, audio = pair
+        output = os.path.join(outdir, out_name)
+        started = time.perf_counter()
+        try:
+            copied = merge(video, audio, output, probes[os.path.basename(audio)][1], overwrite=True, quiet=True)
+            status, error = ("copy" if copied else "aac"), ""
+        except ffmpeg.Error as e:
+            status, error = "failed", (e.stderr or b"").decode(errors="replace").strip().splitlines()[-1:]
+            error = error[0] if error else str(e)
+        except OSError as e:
+            status, error = "failed", str(e)
+        return {"output": output, "video": video, "audio": audio, "audio_mode": status,
+                "seconds": round(time.perf_counter() - started, 3), "error": error}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        probes = dict(pool.map(probe_one, names))
+        return list(pool.map(merge_one, find_pairs(folder, probes)))
+
+
+def write_report(results, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["output", "video", "audio", "audio_mode", "seconds", "error"])
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def merge_interactive():
+    #Exisiting name of the video file
+    input_video = input("Enter video file name: ")
+    input_video += '.mp4'
+
+    #Existing name of audio file
+    input_audio = input("Enter audio file name ")
+    input_audio += '.mp3'
+
+    #Custom name for merged file
+    file_name = input("Name for the file: ")
+    file_name += '.mp4'
+    try:
+        merge(input_video, input_audio, file_name)
+    except Exception as e:
+        print(f"{e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge video-only and audio-only files")
+    parser.add_argument("--batch", metavar="DIR", help="Merge every video/audio pair found in DIR")
+    parser.add_argument("--output-dir", help="Where merged files go (default: the batch directory)")
+    parser.add_argument("--workers", type=int, help="Parallel ffmpeg processes (default: CPU count)")
+    parser.add_argument("--report", metavar="CSV", help="Write per-file timings to CSV")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        merge_interactive()
+        return 0
+
+    missing = [tool for tool in ("ffmpeg", "ffprobe") if not shutil.which(tool)]
+    if missing:
+        print(f"{' and '.join(missing)} not found; install FFmpeg and make sure it is on PATH")
+        return 1
+
+    started = time.perf_counter()
+    results = batch_merge(args.batch, args.output_dir, args.workers)
+    for r in results:
+        line = f"{r['seconds']:8.2f}s  {r['audio_mode']:6}  {os.path.basename(r['output'])}"
+        print(line + (f"  ({r['error']})" if r["error"] else ""))
+    failed = sum(1 for r in results if r["audio_mode"] == "failed")
+    print(f"Merged {len(results) - failed}/{len(results)} pair(s) in {time.perf_counter() - started:.2f}s")
+    if args.report:
+        write_report(results, args.report)
+        print(f"Report written to {args.report}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
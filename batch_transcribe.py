@@ -0,0 +1,284 @@
+"""Batch transcription of recorded audio files (WAV, MP3 and anything ffmpeg reads).
+
+Each file is decoded once to 16 kHz mono PCM and split on silence into
+segments with the frame-level energy VAD from streaming_asr.py. The segments
+are transcribed in parallel worker processes, each of which loads the
+recognizer model once (see recognizers.py), and every file gets timestamped
+transcripts:
+
+    .txt    [00:00:01.230 --> 00:00:04.560] text
+    .srt    subtitles
+    .jsonl  one {"start", "end", "text"} object per segment
+
+Throughput is reported as seconds of audio transcribed per second of wall
+time. Files that already have all their transcripts are skipped. The exit
+status is 1 when no files were found, the backend could not be set up, or any
+file failed.
+
+  python batch_transcribe.py recordings/ --out transcripts/ --backend vosk --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import ffmpeg
+import speech_recognition as sr
+
+from recognizers import BACKENDS, SAMPLE_RATE, SAMPLE_WIDTH, load_backend
+from streaming_asr import FRAME_MS, FRAME_SAMPLES, EnergyVAD, frame_rms
+
+AUDIO_EXTS = {".wav", ".aif", ".aiff", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".webm", ".mp4"}
+SR_EXTS = (".wav", ".aif", ".aiff", ".flac")
+FORMATS = ("txt", "srt", "jsonl")
+FRAME_BYTES = FRAME_SAMPLES * SAMPLE_WIDTH
+# Pause that ends a segment, audio kept around each one, and the longest segment
+# sent to the recognizer (longer speech is cut at its quietest frame)
+MIN_SILENCE_MS = 500
+PAD_MS = 200
+MAX_SEGMENT_S = 30
+# Backends that send every segment to a web API: a batch would hammer the
+# free endpoint from every worker at once, so only the local models are used
+ONLINE_BACKENDS = ("google",)
+LOCAL_BACKENDS = [name for name in BACKENDS if name not in ONLINE_BACKENDS]
+
+
+# ------------------ Decoding ------------------
+def decode_audio(path: str) -> bytes:
+    """The whole file as 16 kHz, 16-bit mono PCM.
+
+    WAV, AIFF and FLAC are read by speech_recognition itself; everything
+    else goes through ffmpeg.
+    """
+    if path.lower().endswith(SR_EXTS):
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        return audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+    try:
+        pcm, _ = (ffmpeg.input(path)
+                  .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+                  .run(capture_stdout=True, capture_stderr=True))
+    except ffmpeg.Error as e:
+        error = (e.stderr or b"").decode(errors="replace").strip().splitlines()[-1:]
+        raise ValueError(f"could not decode {path}: {error[0] if error else e}")
+    return pcm
+
+
+# ------------------ Segmentation ------------------
+def split_on_silence(pcm: bytes, min_silence_ms: int = MIN_SILENCE_MS, pad_ms: int = PAD_MS,
+                     max_segment_s: float = MAX_SEGMENT_S, vad: Optional[EnergyVAD] = None) -> List[Tuple[int, int]]:
+    """Speech segments of `pcm` as (start frame, end frame) pairs, FRAME_MS per frame.
+
+    The noise floor starts at the 5th percentile of frame energy, which in
+    a recording is nearly always a pause, and then adapts as in live capture.
+    """
+    levels = [frame_rms(pcm[i:i + FRAME_BYTES]) for i in range(0, len(pcm) - FRAME_BYTES + 1, FRAME_BYTES)]
+    if not levels:
+        return []
+    vad = vad or EnergyVAD()
+    vad.noise = sorted(levels)[len(levels) // 20]
+    speech = []
+    for level in levels:
+        is_speech = level > vad.threshold()
+        if not is_speech:
+            vad.noise += vad.adapt * (level - vad.noise)
+        speech.append(is_speech)
+
+    gap = max(1, min_silence_ms // FRAME_MS)
+    pad = pad_ms // FRAME_MS
+    max_frames = max(1, int(max_segment_s * 1000 / FRAME_MS))
+    segments = []
+    start = end = None
+    for index, voiced in enumerate(speech):
+        if voiced:
+            if start is None:
+                start = index
+            end = index + 1
+        elif start is not None and index - end >= gap:
+            segments.append((start, end))
+            start = None
+    if start is not None:
+        segments.append((start, end))
+
+    padded = []
+    for start, end in segments:
+        start, end = max(0, start - pad), min(len(levels), end + pad)
+        # Overlong speech is cut at the quietest frame of its last few seconds
+        while end - start > max_frames:
+            window_start = start + max_frames * 3 // 4
+            cut = min(range(window_start, start + max_frames), key=levels.__getitem__)
+            padded.append((start, cut))
+            start = cut
+        if padded and start < padded[-1][1]:
+            start = padded[-1][1]
+        padded.append((start, end))
+    return padded
+
+
+# ------------------ Workers ------------------
+_backend = None
+
+
+def _load_worker(backend_name: str):
+    global _backend
+    _backend = load_backend(backend_name)
+
+
+def _transcribe_segment(pcm: bytes) -> str:
+    try:
+        return _backend.transcribe(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+    except sr.UnknownValueError:
+        return ""
+
+
+# ------------------ Output ------------------
+def timestamp(seconds: float, separator: str = ".") -> str:
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+
+def write_transcripts(base: str, segments: List[Dict], formats=FORMATS):
+    """Write `<base>.txt/.srt/.jsonl` from segments with start, end (seconds) and text."""
+    segments = [s for s in segments if s["text"]]
+    if "txt" in formats:
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            for s in segments:
+                f.write(f"[{timestamp(s['start'])} --> {timestamp(s['end'])}] {s['text']}\n")
+    if "srt" in formats:
+        with open(base + ".srt", "w", encoding="utf-8") as f:
+            for n, s in enumerate(segments, 1):
+                f.write(f"{n}\n{timestamp(s['start'], ',')} --> {timestamp(s['end'], ',')}\n{s['text']}\n\n")
+    if "jsonl" in formats:
+        with open(base + ".jsonl", "w", encoding="utf-8") as f:
+            for s in segments:
+                f.write(json.dumps(s, ensure_ascii=False) + "\n")
+
+
+# ------------------ Batch ------------------
+def find_audio(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, n) for n in os.listdir(path)
+                                if os.path.splitext(n)[1].lower() in AUDIO_EXTS))
+        else:
+            files.append(path)
+    return files
+
+
+def transcribe_files(files: List[str], out_dir: Optional[str] = None, backend: Optional[str] = None,
+                     workers: Optional[int] = None, formats=FORMATS, force: bool = False) -> dict:
+    """Transcribe `files` next to themselves (or into `out_dir`); returns run totals.
+
+    Files are decoded and segmented one by one in this process while the
+    pool works through the segments of the files before them, with at most
+    two files queued, so memory stays bounded on large archives.
+
+    `backend` defaults to $SPEECH_BACKEND, then vosk; online backends are
+    refused with a ValueError.
+    """
+    backend = (backend or os.getenv("SPEECH_BACKEND") or "vosk").lower()
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(f"Batch transcription needs a local speech backend (choose from: {', '.join(LOCAL_BACKENDS)})")
+    workers = workers or os.cpu_count() or 1
+    totals = {"files": 0, "skipped": 0, "failed": 0, "segments": 0, "audio_s": 0.0}
+    started = time.perf_counter()
+
+    def output_base(path):
+        folder = out_dir or os.path.dirname(path)
+        return os.path.join(folder, os.path.splitext(os.path.basename(path))[0])
+
+    def finish(job):
+        path, audio_s, spans, futures = job
+        try:
+            texts = [future.result() for future in futures]
+        except Exception as e:
+            print(f"❌ {os.path.basename(path)}: {e}")
+            totals["failed"] += 1
+            return
+        segments = [{"start": round(start * FRAME_MS / 1000, 3), "end": round(end * FRAME_MS / 1000, 3),
+                     "text": text.strip()} for (start, end), text in zip(spans, texts)]
+        write_transcripts(output_base(path), segments, formats)
+        print(f"📝 {os.path.basename(path)}: {audio_s:.1f}s, {len(spans)} segments")
+        totals["files"] += 1
+        totals["segments"] += len(spans)
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    queued = deque()
+    with ProcessPoolExecutor(workers, initializer=_load_worker, initargs=(backend,)) as pool:
+        try:
+            pool.submit(int).result()
+        except BrokenProcessPool:
+            raise RuntimeError(f"the {backend} speech backend failed to load in the worker processes")
+        for path in files:
+            base = output_base(path)
+            if not force and all(os.path.exists(f"{base}.{fmt}") for fmt in formats):
+                totals["skipped"] += 1
+                continue
+            try:
+                pcm = decode_audio(path)
+            except (ValueError, OSError, EOFError) as e:
+                print(f"❌ {os.path.basename(path)}: {e}")
+                totals["failed"] += 1
+                continue
+            audio_s = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+            totals["audio_s"] += audio_s
+            spans = split_on_silence(pcm)
+            futures = [pool.submit(_transcribe_segment, pcm[start * FRAME_BYTES:end * FRAME_BYTES])
+                       for start, end in spans]
+            queued.append((path, audio_s, spans, futures))
+            if len(queued) > 2:
+                finish(queued.popleft())
+        while queued:
+            finish(queued.popleft())
+
+    totals["seconds"] = round(time.perf_counter() - started, 2)
+    totals["audio_s"] = round(totals["audio_s"], 2)
+    totals["speed"] = round(totals["audio_s"] / totals["seconds"], 2) if totals["seconds"] else 0.0
+    return totals
+
+
+def print_totals(totals: dict):
+    print(f"✅ {totals['files']} transcribed, {totals['skipped']} already done, {totals['failed']} failed: "
+          f"{totals['segments']} segments, {totals['audio_s']:.1f}s of audio in {totals['seconds']}s "
+          f"({totals['speed']:.1f} audio-s per wall-s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe recorded audio files")
+    parser.add_argument("paths", nargs="+", help="Audio files or folders of them")
+    parser.add_argument("--out", help="Folder for transcripts (default: next to each file)")
+    parser.add_argument("--backend", choices=LOCAL_BACKENDS,
+                        help="Recognizer loaded in each worker (default: $SPEECH_BACKEND, then vosk)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="Transcript formats to write")
+    parser.add_argument("--force", action="store_true", help="Redo files that already have transcripts")
+    args = parser.parse_args(argv)
+
+    files = find_audio(args.paths)
+    if not files:
+        print("❌ No audio files found")
+        return 1
+    print(f"🎧 {len(files)} files, {args.backend or os.getenv('SPEECH_BACKEND') or 'vosk'} backend")
+    try:
+        totals = transcribe_files(files, args.out, args.backend, args.workers, args.formats, args.force)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    print_totals(totals)
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Deterministic, cached language detection on top of langdetect.
+
+langdetect's detect_langs() samples n-grams at random, so the same sentence
+can come back with a different answer on the next call. Here the language
+profiles are loaded once (preload() at startup, or on first use), the
+detector is seeded so the same text always gets the same answer, and results
+are memoized per text, so asking again, e.g. to pick the TTS voice for a
+transcript that was just labelled, costs nothing.
+
+    detect_languages("Bonjour tout le monde")   # (fr:0.9999...,)
+    detect_language("Hola, ¿qué tal?")          # 'es'
+    detect_batch(transcripts, processes=4)      # one code per transcript
+    tts_language("zh-cn")                       # 'zh-CN', a gTTS language
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from langdetect import detector_factory
+from langdetect.lang_detect_exception import LangDetectException
+from langdetect.language import Language
+
+DETECT_SEED = 0
+CACHE_SIZE = 10000
+# langdetect reads at most this much of a text anyway
+MAX_TEXT_CHARS = 10000
+# Below this many uncached texts a batch is detected in this process
+BATCH_MIN_FOR_PROCESSES = 500
+
+_factory = None
+_factory_lock = threading.Lock()
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def preload():
+    """Load the language profiles now instead of on the first detection."""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            detector_factory.init_factory()
+            factory = detector_factory._factory
+            factory.set_seed(DETECT_SEED)
+            _factory = factory
+    return _factory
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())[:MAX_TEXT_CHARS]
+
+
+def _detect(text: str) -> Tuple[Language, ...]:
+    detector = (_factory or preload()).create()
+    detector.append(text)
+    try:
+        return tuple(detector.get_probabilities())
+    except LangDetectException:
+        # No letters to go on (digits, punctuation, empty)
+        return ()
+
+
+def _remember(text: str, result: Tuple[Language, ...]):
+    with _cache_lock:
+        _cache[text] = result
+        _cache.move_to_end(text)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _cached(text: str):
+    with _cache_lock:
+        result = _cache.get(text)
+        if result is not None:
+            _cache.move_to_end(text)
+        return result
+
+
+def detect_languages(text: str) -> Tuple[Language, ...]:
+    """Candidate languages with probabilities, most likely first; () when undetectable."""
+    text = _normalize(text)
+    result = _cached(text)
+    if result is None:
+        result = _detect(text)
+        _remember(text, result)
+    return result
+
+
+def detect_language(text: str, default: Optional[str] = None) -> Optional[str]:
+    """The most likely language code ('en', 'zh-cn', ...), or `default`."""
+    languages = detect_languages(text)
+    return languages[0].lang if languages else default
+
+
+def _detect_chunk(texts: List[str]) -> List[Tuple[Language, ...]]:
+    return [_detect(text) for text in texts]
+
+
+def detect_batch(texts: Iterable[str], default: Optional[str] = None,
+                 processes: Optional[int] = None) -> List[Optional[str]]:
+    """Language code for every text, in order.
+
+    Repeated and previously seen texts are detected once. With `processes`
+    set, a large batch of new texts is spread over that many worker
+    processes, each of which loads the profiles once.
+    """
+    texts = [_normalize(text) for text in texts]
+    # Results are kept here as well, since a batch can be larger than the cache
+    found = {}
+    for text in dict.fromkeys(texts):
+        result = _cached(text)
+        if result is not None:
+            found[text] = result
+    todo = [text for text in dict.fromkeys(texts) if text not in found]
+
+    if processes and processes > 1 and len(todo) >= BATCH_MIN_FOR_PROCESSES:
+        size = -(-len(todo) // (processes * 4))
+        chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+        with ProcessPoolExecutor(processes, initializer=preload) as pool:
+            for chunk, results in zip(chunks, pool.map(_detect_chunk, chunks)):
+                found.update(zip(chunk, results))
+    else:
+        found.update((text, _detect(text)) for text in todo)
+    for text in todo:
+        _remember(text, found[text])
+    return [found[text][0].lang if found[text] else default for text in texts]
+
+
+# ------------------ TTS voices ------------------
+# langdetect codes that gTTS knows under another name
+_TTS_ALIASES = {"he": "iw"}
+
+
+@lru_cache(maxsize=1)
+def _tts_languages():
+    from gtts.lang import tts_langs
+    return {lang.lower(): lang for lang in tts_langs()}
+
+
+def tts_language(code: Optional[str], default: str = "en") -> str:
+    """The gTTS language for a detected language code, or `default` when gTTS has no voice for it."""
+    if not code:
+        return default
+    available = _tts_languages()
+    code = _TTS_ALIASES.get(code.lower(), code.lower())
+    for candidate in (code, code.split("-")[0]):
+        if candidate in available:
+            return available[candidate]
+    return default
+
+
+def detect_tts_language(text: str, default: str = "en") -> str:
+    """Shortcut for tts_language(detect_language(text))."""
+    return tts_language(detect_language(text), default)
+
+
+if __name__ == "__main__":
+    import sys
+    preload()
+    lines = [line.strip() for line in sys.stdin if line.strip()]
+    for line, lang in zip(lines, detect_batch(lines, default="?", processes=os.cpu_count())):
+        print(f"{lang}\t{line}")
@@ -0,0 +1,79 @@
+"""Media Downloader: yt-dlp front ends for the command line, batch jobs and a Tk GUI.
+
+    python -m media_downloader                      # GUI
+    python -m media_downloader --batch urls.txt     # headless batch download
+    python -m media_downloader.importtime           # cold-start import benchmark
+
+Submodules are only imported when one of their names is first used, so
+`import media_downloader` costs next to nothing and a batch run never
+loads Tk, PIL or ffmpeg.
+"""
+
+import importlib
+import sys
+import types
+
+_EXPORTS = {
+    "METADATA_CACHE_ENABLED": "cache",
+    "METADATA_CACHE_PATH": "cache",
+    "METADATA_CACHE_TTL": "cache",
+    "METADATA_CACHE_MAX_BYTES": "cache",
+    "MetadataCache": "cache",
+    "metadata_cache": "cache",
+    "extract_info_cached": "cache",
+    "download_with_info": "cache",
+    "sort_and_print_formats": "cli",
+    "downloader": "cli",
+    "stream_mux_download": "cli",
+    "download_yt_short": "cli",
+    "download_instagram_reel": "cli",
+    "merge_video_audio": "cli",
+    "main": "cli",
+    "read_url_list": "batch",
+    "url_host": "batch",
+    "cookiefile_for": "batch",
+    "BandwidthLimiter": "batch",
+    "BatchProgress": "batch",
+    "batch_download": "batch",
+    "run_batch": "batch",
+    "_run_batch_job": "batch",
+    "MediaDownloaderApp": "gui",
+    "run_gui": "gui",
+    "FormatTable": "format_table",
+    "classify_formats": "format_table",
+    "print_formats": "format_table",
+    "valid_format_ids": "format_table",
+    "readable_size": "format_table",
+    "ResumableYoutubeDL": "chunked_download",
+}
+
+# Settings their module reads when it runs: they are looked up there every time
+# instead of being copied here, and assigning one here sets it there
+_SETTINGS = {"METADATA_CACHE_ENABLED", "METADATA_CACHE_PATH", "METADATA_CACHE_TTL", "METADATA_CACHE_MAX_BYTES"}
+
+__all__ = [name for name in _EXPORTS if not name.startswith("_")]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    if name not in _SETTINGS:
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        if name in _SETTINGS:
+            setattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
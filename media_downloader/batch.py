@@ -0,0 +1,293 @@
+"""Bounded, host-aware batch downloads (--batch)."""
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from urllib.parse import urlparse
+
+from .cache import download_with_info
+from .format_table import readable_size
+
+
+def read_url_list(source):
+    """Read URLs from a text file, or from stdin when source is '-'.
+
+    Blank lines, '#' comments and duplicates are skipped.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    urls = []
+    seen = set()
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith('#') or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+def url_host(url):
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def cookiefile_for(url):
+    return 'instagram_cookies.txt' if 'instagram' in url_host(url) else 'youtube_cookies.txt'
+
+
+class BandwidthLimiter:
+    """Token bucket shared by every download thread of a batch."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, nbytes):
+        if not self.rate or nbytes <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= nbytes
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class BatchProgress:
+    """Aggregated progress/ETA line for all jobs of a batch."""
+
+    def __init__(self, total_jobs, stream=None, interval=0.5):
+        self.total_jobs = total_jobs
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.active = {}
+        self.done = 0
+        self.failed = 0
+        self.bytes_done = 0
+        self.started = time.monotonic()
+        self._last_render = 0.0
+
+    def update(self, key, downloaded, total):
+        with self.lock:
+            prev_downloaded, _ = self.active.get(key, (0, 0))
+            if downloaded < prev_downloaded:
+                # yt-dlp moved on to the next file of this job (e.g. audio after video)
+                self.bytes_done += prev_downloaded
+                prev_downloaded = 0
+            self.active[key] = (downloaded, total or 0)
+        self.render()
+        return downloaded - prev_downloaded
+
+    def finish(self, key, ok):
+        with self.lock:
+            downloaded, _ = self.active.pop(key, (0, 0))
+            self.bytes_done += downloaded
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+        self.render(force=True)
+
+    def snapshot(self):
+        with self.lock:
+            finished = self.done + self.failed
+            partial = sum(d / t for d, t in self.active.values() if t)
+            downloaded = self.bytes_done + sum(d for d, _ in self.active.values())
+            elapsed = time.monotonic() - self.started
+            fraction = (finished + partial) / self.total_jobs if self.total_jobs else 1.0
+            eta = elapsed / fraction - elapsed if fraction > 0 else None
+            return {
+                "finished": finished,
+                "failed": self.failed,
+                "active": len(self.active),
+                "bytes": downloaded,
+                "speed": downloaded / elapsed if elapsed > 0 else 0,
+                "elapsed": elapsed,
+                "eta": eta,
+            }
+
+    def render(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_render < self.interval:
+            return
+        self._last_render = now
+        s = self.snapshot()
+        eta = f"{int(s['eta'] // 60)}m{int(s['eta'] % 60):02d}s" if s['eta'] is not None else "--"
+        self.stream.write(
+            f"\r[{s['finished']}/{self.total_jobs}] active={s['active']} failed={s['failed']} "
+            f"{readable_size(s['bytes'])} @ {readable_size(s['speed'])}/s ETA {eta}   "
+        )
+        self.stream.flush()
+
+
+class _QueueProgressHook:
+    """Progress hook for --processes jobs: sends byte counts to the parent's queue.
+
+    A plain class rather than a closure so it pickles along with the job's
+    options; updates are throttled to one per `interval` seconds.
+    """
+
+    def __init__(self, queue, key, interval=0.2):
+        self.queue = queue
+        self.key = key
+        self.interval = interval
+        self._last_sent = 0.0
+
+    def __call__(self, d):
+        if d.get('status') != 'downloading':
+            return
+        now = time.monotonic()
+        if now - self._last_sent < self.interval:
+            return
+        self._last_sent = now
+        self.queue.put((self.key, d.get('downloaded_bytes') or 0,
+                        d.get('total_bytes') or d.get('total_bytes_estimate')))
+
+
+def _forward_progress(queue, progress, finished):
+    """Apply updates from process workers until the None sentinel arrives."""
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+        # An update can arrive after its job was reported finished; drop it
+        if item[0] not in finished:
+            progress.update(*item)
+
+
+def _run_batch_job(url, ydl_opts):
+    """Download one URL; module level so a process pool can pickle it."""
+    from .chunked_download import ResumableYoutubeDL
+    opts = dict(ydl_opts)
+    opts.setdefault('cookiefile', cookiefile_for(url))
+    try:
+        with ResumableYoutubeDL(opts) as ydl:
+            download_with_info(ydl, url)
+        return url, True, None
+    except Exception as e:
+        return url, False, str(e)
+
+
+def batch_download(urls, workers=4, per_host=2, rate_limit=None, use_processes=False,
+                   fmt='bestvideo+bestaudio/best', outdir='.'):
+    """Download many URLs over a bounded pool.
+
+    At most `workers` downloads run at once and at most `per_host` of them
+    hit the same host.  `rate_limit` (bytes/s) caps the whole batch: threads
+    share one token bucket, processes each get an equal slice of it.
+    Process workers report their progress through a multiprocessing queue.
+    Returns a list of (url, ok, error) tuples in completion order.
+    """
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+    os.makedirs(outdir, exist_ok=True)
+    progress = BatchProgress(len(urls))
+    limiter = BandwidthLimiter(rate_limit) if rate_limit and not use_processes else None
+    base_opts = {
+        'format': fmt,
+        # The id keeps different videos with the same title from overwriting each other
+        'outtmpl': os.path.join(outdir, '%(title)s [%(id)s].%(ext)s'),
+        'merge_output_format': 'mp4',
+        'quiet': True,
+        'noprogress': True,
+        'noplaylist': True,
+    }
+    if rate_limit and use_processes:
+        base_opts['ratelimit'] = max(1, rate_limit // workers)
+
+    updates = None
+    finished_urls = set()
+
+    def job_opts(url):
+        if use_processes:
+            return dict(base_opts, progress_hooks=[_QueueProgressHook(updates, url)])
+
+        def hook(d):
+            if d.get('status') == 'downloading':
+                delta = progress.update(url, d.get('downloaded_bytes') or 0,
+                                        d.get('total_bytes') or d.get('total_bytes_estimate'))
+                # Range downloads already waited on the limiter for these bytes
+                if limiter and not d.get('bandwidth_limited'):
+                    limiter.consume(delta)
+
+        return dict(base_opts, progress_hooks=[hook], bandwidth_limiter=limiter)
+
+    pending = deque(urls)
+    host_active = {}
+    running = {}
+    results = []
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    def next_ready():
+        # First queued URL whose host still has a free slot
+        for i, url in enumerate(pending):
+            if host_active.get(url_host(url), 0) < per_host:
+                del pending[i]
+                return url
+        return None
+
+    with ExitStack() as stack:
+        if use_processes:
+            updates = stack.enter_context(multiprocessing.Manager()).Queue()
+            forwarder = threading.Thread(target=_forward_progress, args=(updates, progress, finished_urls),
+                                         daemon=True)
+            forwarder.start()
+            stack.callback(forwarder.join)
+            stack.callback(updates.put, None)
+        with executor_cls(max_workers=workers) as pool:
+            while pending or running:
+                while len(running) < workers:
+                    url = next_ready()
+                    if url is None:
+                        break
+                    host = url_host(url)
+                    host_active[host] = host_active.get(host, 0) + 1
+                    running[pool.submit(_run_batch_job, url, job_opts(url))] = url
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    url = running.pop(fut)
+                    host_active[url_host(url)] -= 1
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        result = (url, False, str(e))
+                    finished_urls.add(url)
+                    progress.finish(url, result[1])
+                    results.append(result)
+
+    progress.stream.write("\n")
+    return results
+
+
+def run_batch(args):
+    try:
+        urls = read_url_list(args.batch)
+    except OSError as e:
+        print(f" Could not read URL list: {e}")
+        return 1
+    if not urls:
+        print(" No URLs to download.")
+        return 1
+
+    mode = "processes" if args.processes else "threads"
+    print(f" Downloading {len(urls)} URL(s) with {args.workers} {mode}, {args.per_host} per host...")
+    started = time.monotonic()
+    results = batch_download(urls, workers=args.workers, per_host=args.per_host, rate_limit=args.limit_rate,
+                             use_processes=args.processes, fmt=args.format, outdir=args.output_dir)
+    failed = [(url, err) for url, ok, err in results if not ok]
+    print(f" Finished {len(results) - len(failed)}/{len(results)} in {time.monotonic() - started:.1f}s")
+    for url, err in failed:
+        print(f" Failed: {url}" + (f" ({err})" if err else ""))
+    return 1 if failed else 0
@@ -0,0 +1,151 @@
+"""yt-dlp metadata cache shared by the CLI, batch and GUI front ends."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+METADATA_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".media_downloader", "metadata.sqlite")
+# Stream URLs inside an info dict expire after a few hours, keep well below that
+METADATA_CACHE_TTL = 3600
+METADATA_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# yt-dlp options that change what extraction returns for the same URL
+CACHE_KEY_OPTIONS = ("cookiefile", "cookiesfrombrowser", "noplaylist", "playlist_items",
+                     "extractor_args", "proxy", "geo_bypass_country", "username")
+
+
+class MetadataCache:
+    """On-disk cache of yt-dlp info dicts keyed by URL (see cache_key()).
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    dropped once the stored JSON exceeds `max_bytes`.
+    """
+
+    def __init__(self, path=METADATA_CACHE_PATH, ttl=METADATA_CACHE_TTL, max_bytes=METADATA_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS info ("
+                "url TEXT PRIMARY KEY, fetched REAL, accessed REAL, size INTEGER, data TEXT)"
+            )
+
+    def get(self, url):
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT fetched, data FROM info WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            if now - row[0] > self.ttl:
+                self.conn.execute("DELETE FROM info WHERE url = ?", (url,))
+                return None
+            self.conn.execute("UPDATE info SET accessed = ? WHERE url = ?", (now, url))
+        return json.loads(row[1])
+
+    def put(self, url, info):
+        data = json.dumps(info)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO info (url, fetched, accessed, size, data) VALUES (?, ?, ?, ?, ?)",
+                (url, now, now, len(data), data),
+            )
+            self._evict(now)
+
+    def invalidate(self, url):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM info WHERE url = ?", (url,))
+
+    def _evict(self, now):
+        self.conn.execute("DELETE FROM info WHERE fetched < ?", (now - self.ttl,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM info").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute("SELECT url, size FROM info ORDER BY accessed").fetchall():
+            self.conn.execute("DELETE FROM info WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_metadata_cache = None
+_metadata_cache_pid = None
+_metadata_cache_lock = threading.Lock()
+METADATA_CACHE_ENABLED = True
+
+
+def metadata_cache():
+    """Process-wide MetadataCache, reopened in forked workers."""
+    global _metadata_cache, _metadata_cache_pid
+    if not METADATA_CACHE_ENABLED:
+        return None
+    with _metadata_cache_lock:
+        if _metadata_cache is None or _metadata_cache_pid != os.getpid():
+            try:
+                _metadata_cache = MetadataCache(METADATA_CACHE_PATH, METADATA_CACHE_TTL, METADATA_CACHE_MAX_BYTES)
+            except sqlite3.Error as e:
+                print(f" Metadata cache unavailable: {e}")
+                return None
+            _metadata_cache_pid = os.getpid()
+        return _metadata_cache
+
+
+def cache_key(ydl, link):
+    """`link` plus the options of `ydl` that affect extraction, e.g. which cookies are sent."""
+    options = {k: ydl.params[k] for k in CACHE_KEY_OPTIONS if ydl.params.get(k) is not None}
+    if isinstance(options.get("cookiefile"), str):
+        options["cookiefile"] = os.path.abspath(options["cookiefile"])
+    return link + (" " + json.dumps(options, sort_keys=True, default=str) if options else "")
+
+
+def is_playlist(info):
+    return info.get("_type", "video") in ("playlist", "multi_video") or "entries" in info
+
+
+def extract_info_cached(ydl, link):
+    """extract_info(download=False), served from the metadata cache when fresh.
+
+    Playlists are never cached: sanitizing for storage drops their entries.
+    They are returned as extracted, so download_with_info can hand the same
+    dict back to yt-dlp instead of extracting the whole playlist again.
+    """
+    cache = metadata_cache()
+    key = cache_key(ydl, link)
+    info = cache.get(key) if cache else None
+    if info is None:
+        info = ydl.extract_info(link, download=False)
+        if is_playlist(info):
+            return info
+        info = ydl.sanitize_info(info, remove_private_keys=True)
+        if cache:
+            cache.put(key, info)
+    return info
+
+
+def download_with_info(ydl, link):
+    """Download `link` by re-processing its cached info dict instead of re-extracting.
+
+    yt-dlp re-runs format selection with this ydl's options, so one cached
+    dict serves every format. Falls back to a fresh extraction if the
+    cached stream URLs turn out to be stale. Playlists are downloaded from
+    the info just extracted, so their entries are only resolved once.
+    """
+    from yt_dlp.utils import DownloadError
+    info = extract_info_cached(ydl, link)
+    if is_playlist(info):
+        ydl.process_ie_result(info, download=True)
+        return
+    try:
+        ydl.process_ie_result(info, download=True)
+    except DownloadError:
+        cache = metadata_cache()
+        if cache:
+            cache.invalidate(cache_key(ydl, link))
+        if ydl.download([link]) != 0:
+            raise
@@ -0,0 +1,267 @@
+import os
+import json
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+from yt_dlp.networking import Request
+
+from .batch import BandwidthLimiter
+
+CHUNK_SIZE = 16 * 1024 * 1024
+CHUNK_WORKERS = 4
+# Smaller formats are left to yt-dlp's own sequential downloader
+CHUNKED_MIN_SIZE = 32 * 1024 * 1024
+# Bytes written by a worker before its progress is fsync'd and journaled
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+BLOCK_SIZE = 256 * 1024
+CHUNK_RETRIES = 5
+
+
+CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+class RangeNotSupported(Exception):
+    pass
+
+
+def check_range_response(resp, start, size):
+    """Raise RangeNotSupported unless `resp` is a 206 for bytes `start`- of a `size`-byte file.
+
+    `size` comes from the extractor's metadata, which can be stale or
+    approximate; the Content-Range total is what the server will actually send.
+    """
+    if resp.status != 206:
+        raise RangeNotSupported(f"server answered {resp.status} to a range request")
+    match = CONTENT_RANGE_RE.match(resp.headers.get('Content-Range') or '')
+    if not match:
+        raise RangeNotSupported("range response without a usable Content-Range header")
+    if int(match.group(1)) != start:
+        raise RangeNotSupported(f"server sent bytes from {match.group(1)} instead of {start}")
+    if match.group(3) != str(size):
+        raise RangeNotSupported(f"server reports {match.group(3)} bytes, metadata said {size}")
+
+
+class DownloadJournal:
+    """Crash-safe sidecar index of the byte ranges already present in a .part file.
+
+    Progress is tracked per fixed-size chunk and saved as merged
+    [start, end) ranges. The journal is only updated after the data it
+    describes has been fsync'd, and is replaced atomically, so after a crash
+    it never claims bytes that are not on disk.
+    """
+
+    def __init__(self, path, key, size, chunk_size):
+        self.path = path
+        self.key = key
+        self.size = size
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.done = [0] * self.chunk_count
+        self._load()
+
+    @property
+    def chunk_count(self):
+        return (self.size + self.chunk_size - 1) // self.chunk_size
+
+    def chunk_bounds(self, index):
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.size)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("key") != self.key or data.get("size") != self.size:
+            return
+        for start, end in data.get("ranges", []):
+            # Map each saved range back onto the chunks it starts in
+            pos = start
+            while pos < end:
+                index = pos // self.chunk_size
+                chunk_start, chunk_end = self.chunk_bounds(index)
+                upto = min(end, chunk_end)
+                if pos == chunk_start + self.done[index]:
+                    self.done[index] = upto - chunk_start
+                pos = upto
+
+    def ranges(self):
+        merged = []
+        for index, done in enumerate(self.done):
+            if not done:
+                continue
+            start = index * self.chunk_size
+            if merged and merged[-1][1] == start:
+                merged[-1][1] = start + done
+            else:
+                merged.append([start, start + done])
+        return merged
+
+    def record(self, index, done):
+        with self.lock:
+            self.done[index] = done
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"key": self.key, "size": self.size, "ranges": self.ranges()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+    def remaining(self):
+        return [i for i in range(self.chunk_count)
+                if self.done[i] < self.chunk_bounds(i)[1] - self.chunk_bounds(i)[0]]
+
+    def bytes_done(self):
+        return sum(self.done)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def fetch_ranges(ydl, url, filename, size, key, headers=None, chunk_size=CHUNK_SIZE,
+                 workers=CHUNK_WORKERS, progress=None, limiter=None):
+    """Download `url` into `filename` as parallel HTTP range requests.
+
+    Writes go to `filename + '.part'` and are tracked in a `.journal` sidecar,
+    so a rerun after an interruption only fetches the missing bytes.
+    `progress(downloaded, total)` is called as data arrives, and every worker
+    waits on `limiter.consume(nbytes)` (a BandwidthLimiter) after each block.
+    Raises RangeNotSupported when the server ignores ranges or its
+    Content-Range total disagrees with `size`.
+    """
+    part = filename + '.part'
+    journal = DownloadJournal(filename + '.journal', key, size, chunk_size)
+    if not os.path.isfile(part):
+        journal.done = [0] * journal.chunk_count
+    with open(part, 'ab') as f:
+        if f.tell() != size:
+            f.truncate(size)
+
+    downloaded = [journal.bytes_done()]
+    progress_lock = threading.Lock()
+    report_lock = threading.Lock()
+
+    def advance(nbytes):
+        with progress_lock:
+            downloaded[0] += nbytes
+        if limiter:
+            limiter.consume(nbytes)
+        # Hooks run outside the counter lock, one at a time; a worker that finds
+        # another one reporting moves on, its bytes are in the next report
+        if progress and report_lock.acquire(blocking=False):
+            try:
+                with progress_lock:
+                    current = downloaded[0]
+                progress(current, size)
+            finally:
+                report_lock.release()
+
+    def fetch_chunk(index):
+        chunk_start, chunk_end = journal.chunk_bounds(index)
+        # Bytes written but not yet journaled are still valid in this process
+        done = journal.done[index]
+        for attempt in range(CHUNK_RETRIES):
+            if chunk_start + done >= chunk_end:
+                break
+            req = Request(url, headers=dict(headers or {}, Range=f"bytes={chunk_start + done}-{chunk_end - 1}"))
+            try:
+                with ydl.urlopen(req) as resp, open(part, 'r+b') as out:
+                    check_range_response(resp, chunk_start + done, size)
+                    out.seek(chunk_start + done)
+                    unsynced = 0
+                    while chunk_start + done < chunk_end:
+                        block = resp.read(min(BLOCK_SIZE, chunk_end - chunk_start - done))
+                        if not block:
+                            break
+                        out.write(block)
+                        done += len(block)
+                        unsynced += len(block)
+                        advance(len(block))
+                        if unsynced >= CHECKPOINT_BYTES:
+                            out.flush()
+                            os.fsync(out.fileno())
+                            journal.record(index, done)
+                            unsynced = 0
+                    out.flush()
+                    os.fsync(out.fileno())
+                    journal.record(index, done)
+            except RangeNotSupported:
+                raise
+            except Exception:
+                if attempt == CHUNK_RETRIES - 1:
+                    raise
+                time.sleep(min(2 ** attempt, 30))
+        if journal.done[index] < chunk_end - chunk_start:
+            raise IOError(f"chunk {index} incomplete after {CHUNK_RETRIES} attempts")
+
+    if progress:
+        progress(downloaded[0], size)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch_chunk, journal.remaining()))
+    if progress:
+        progress(downloaded[0], size)
+
+    os.replace(part, filename)
+    journal.remove()
+
+
+class ResumableYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL that fetches large progressive HTTP formats as resumable range chunks.
+
+    Everything else (DASH/HLS fragments, small files, merged outputs) goes
+    through yt-dlp's usual downloaders.
+    """
+
+    def _chunkable(self, name, info):
+        if name == '-' or hasattr(name, 'write') or '\n' in (info.get('url') or ''):
+            return False
+        if info.get('protocol') not in ('http', 'https'):
+            return False
+        return (info.get('filesize') or 0) >= CHUNKED_MIN_SIZE
+
+    def dl(self, name, info, subtitle=False, test=False):
+        if subtitle or test or not self._chunkable(name, info):
+            return super().dl(name, info, subtitle, test)
+        if self.params.get('continuedl', True) and os.path.isfile(name):
+            self.to_screen(f"[download] {name} has already been downloaded")
+            return True, False
+
+        size = info['filesize']
+        chunk_size = CHUNK_SIZE
+        # Some sites (YouTube) throttle large single ranges; honour their hint
+        hinted = (info.get('downloader_options') or {}).get('http_chunk_size')
+        if hinted:
+            chunk_size = min(chunk_size, hinted)
+        key = f"{info.get('id')}:{info.get('format_id')}:{size}"
+        hooks = self.params.get('progress_hooks') or []
+        # A batch shares its limiter between threads; on its own (or in a worker
+        # process) --limit-rate applies to this download
+        limiter = self.params.get('bandwidth_limiter')
+        if limiter is None and self.params.get('ratelimit'):
+            limiter = BandwidthLimiter(self.params['ratelimit'])
+
+        def progress(downloaded, total):
+            for hook in hooks:
+                hook({'status': 'downloading', 'filename': name, 'downloaded_bytes': downloaded,
+                      'total_bytes': total, 'info_dict': info, 'bandwidth_limited': limiter is not None})
+
+        self.to_screen(f"[download] Destination: {name} ({CHUNK_WORKERS} range workers)")
+        try:
+            fetch_ranges(self, info['url'], name, size, key, headers=info.get('http_headers'),
+                         chunk_size=chunk_size, progress=progress, limiter=limiter)
+        except RangeNotSupported as e:
+            self.report_warning(f"{e}; falling back to a sequential download")
+            for leftover in (name + '.part', name + '.journal'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            return super().dl(name, info, subtitle, test)
+        for hook in hooks:
+            hook({'status': 'finished', 'filename': name, 'total_bytes': size, 'info_dict': info})
+        return True, True
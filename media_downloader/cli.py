@@ -0,0 +1,198 @@
+"""Command-line entry point and the interactive download helpers.
+
+Nothing heavy is imported here at module level: yt-dlp is loaded by the
+function that downloads, ffmpeg only for a merge and Tk only when the GUI
+is opened, so scripted runs start quickly.
+"""
+
+import argparse
+import sys
+
+from . import cache
+from .cache import download_with_info, extract_info_cached
+from .format_table import classify_formats, print_formats, valid_format_ids
+
+
+def sort_and_print_formats(formats):
+    classes = classify_formats(formats)
+    print_formats(classes)
+    return valid_format_ids(classes)
+
+
+def downloader(link):
+    import yt_dlp
+    try:
+        with yt_dlp.YoutubeDL({'cookiefile': 'youtube_cookies.txt'}) as ydl_info:
+            vid_info = extract_info_cached(ydl_info, link)
+    except Exception as e:
+        print(" Error during info extraction:", e)
+        return
+
+    classes = classify_formats(vid_info.get("formats", []))
+    print_formats(classes)
+    fvalid_ids = valid_format_ids(classes)
+
+    choice = input("\nEnter format ID(s) (comma-separated): ").strip()
+    selected_ids = [x.strip() for x in choice.split(',') if x.strip()]
+    invalid_ids = [x for x in selected_ids if x not in fvalid_ids]
+
+    if invalid_ids:
+        print(f" Invalid format IDs: {', '.join(invalid_ids)}")
+        return
+
+    picked_video = [x for x in selected_ids if x in {f["id"] for f in classes.video_only}]
+    picked_audio = [x for x in selected_ids if x in {f["id"] for f in classes.audio_only}]
+    if len(selected_ids) == 2 and len(picked_video) == 1 and len(picked_audio) == 1:
+        if input(" Mux video and audio while downloading? (y/n): ").strip().lower() == 'y':
+            try:
+                stream_mux_download(link, picked_video[0], picked_audio[0])
+            except Exception as e:
+                print(f" Error muxing formats {picked_video[0]}+{picked_audio[0]}:", e)
+            return
+
+    from concurrent.futures import ThreadPoolExecutor
+    from .chunked_download import ResumableYoutubeDL
+
+    def fetch_format(fmt):
+        print(f"\n Downloading format [{fmt}]...")
+        ydl_opts = {
+            'format': fmt,
+            'outtmpl': f'%(title)s_{fmt}.%(ext)s',
+            'merge_output_format': 'mp4',
+            'cookiefile': 'youtube_cookies.txt'
+        }
+        try:
+            with ResumableYoutubeDL(ydl_opts) as ydl:
+                download_with_info(ydl, link)
+        except Exception as e:
+            print(f" Error downloading format {fmt}:", e)
+
+    # Selected formats are independent files, so fetch them side by side
+    with ThreadPoolExecutor(max_workers=min(len(selected_ids), 4) or 1) as pool:
+        list(pool.map(fetch_format, selected_ids))
+
+
+def stream_mux_download(link, video_id, audio_id):
+    """Download a video-only and an audio-only format through one ffmpeg mux.
+
+    yt-dlp hands both stream URLs to a single ffmpeg process that copies
+    them into the mp4 as the bytes arrive, so no per-format files are
+    written and read back for a separate merge step.
+    """
+    ydl_opts = {
+        'format': f'{video_id}+{audio_id}',
+        'outtmpl': f'%(title)s_{video_id}+{audio_id}.%(ext)s',
+        'merge_output_format': 'mp4',
+        'external_downloader': {'default': 'ffmpeg'},
+        'cookiefile': 'youtube_cookies.txt'
+    }
+    from .chunked_download import ResumableYoutubeDL
+    print(f"\n Downloading and muxing [{video_id}+{audio_id}]...")
+    with ResumableYoutubeDL(ydl_opts) as ydl:
+        download_with_info(ydl, link)
+    print(" Muxed file saved.")
+
+
+def download_yt_short(link):
+    from .chunked_download import ResumableYoutubeDL
+    try:
+        ydl_opts = {
+            'format': 'bestvideo+bestaudio/best',
+            'outtmpl': '%(title)s_short.%(ext)s',
+            'merge_output_format': 'mp4',
+            'noplaylist': True,
+            'cookiefile': 'youtube_cookies.txt'
+        }
+        with ResumableYoutubeDL(ydl_opts) as ydl:
+            download_with_info(ydl, link)
+        print(" Short downloaded successfully.")
+    except Exception as e:
+        print(" Failed to download Short:", e)
+
+
+def download_instagram_reel(link):
+    from .chunked_download import ResumableYoutubeDL
+    try:
+        ydl_opts = {
+            'format': 'best',
+            'outtmpl': '%(title)s_reel.%(ext)s',
+            'merge_output_format': 'mp4',
+            'cookiefile': 'instagram_cookies.txt'
+        }
+        with ResumableYoutubeDL(ydl_opts) as ydl:
+            download_with_info(ydl, link)
+        print(" Reel downloaded successfully.")
+    except Exception as e:
+        print(" Failed to download Reel:", e)
+
+
+def merge_video_audio():
+    video_file = input("Enter video file name (without .mp4): ").strip()
+    if not video_file.lower().endswith('.mp4'):
+        video_file += '.mp4'
+
+    audio_file = input("Enter audio file name (without .mp3): ").strip()
+    if not audio_file.lower().endswith('.mp3'):
+        audio_file += '.mp3'
+
+    output_file = input("Enter name for merged file (without extension): ").strip()
+    if not output_file.lower().endswith('.mp4'):
+        output_file += '.mp4'
+
+    import ffmpeg
+    try:
+        ffmpeg.input(video_file).output(
+            audio_file, output_file, vcodec='copy', acodec='aac', strict='experimental'
+        ).run(overwrite_output=True)
+        print(f" Merged file saved as: {output_file}")
+    except Exception as e:
+        print(f" Error during merging: {e}")
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def byte_rate(value):
+    """argparse type for rates such as 500K or 4M; returns bytes per second."""
+    from yt_dlp.utils import parse_bytes
+    rate = parse_bytes(value)
+    if not rate:
+        raise argparse.ArgumentTypeError(f"invalid rate: '{value}' (e.g. 500K or 4M)")
+    return rate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Media Downloader")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Download every URL listed in FILE ('-' reads stdin) instead of opening the GUI")
+    parser.add_argument('--workers', type=positive_int, default=4, help='Concurrent downloads (default: 4)')
+    parser.add_argument('--processes', action='store_true', help='Use a process pool instead of threads')
+    parser.add_argument('--per-host', type=positive_int, default=2, help='Concurrent downloads per host (default: 2)')
+    parser.add_argument('--limit-rate', metavar='RATE', type=byte_rate, help='Global bandwidth cap, e.g. 500K or 4M (bytes/s)')
+    parser.add_argument('--format', default='bestvideo+bestaudio/best', help='yt-dlp format selector')
+    parser.add_argument('--output-dir', default='.', help='Where batch downloads are saved')
+    parser.add_argument('--no-cache', action='store_true', help='Always re-extract metadata instead of using the cache')
+    args = parser.parse_args(argv)
+
+    if args.no_cache:
+        cache.METADATA_CACHE_ENABLED = False
+
+    if args.batch:
+        from .batch import run_batch
+        return run_batch(args)
+
+    # Only an interactive start pays for Tk (and PIL)
+    from .gui import run_gui
+    return run_gui()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
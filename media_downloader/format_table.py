@@ -0,0 +1,152 @@
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+# Minimum plausible size (MB) of a muxed video+audio format at a given height
+_MIN_SIZE_HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+_MIN_SIZE_BYTES = tuple(int(mb * 1024 * 1024) for mb in (0.5, 1, 2, 3, 5, 8, 12, 20))
+_MIN_SIZE_FALLBACK = 2 * 1024 * 1024
+
+HAS_VIDEO = 1
+HAS_AUDIO = 2
+
+FormatClasses = namedtuple("FormatClasses", ["allowed", "blocked", "video_only", "audio_only"])
+
+
+def readable_size(size_bytes):
+    if not size_bytes:
+        return "Unknown"
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024:
+            return f"{size_bytes:.2f} {unit}"
+        size_bytes /= 1024
+    return f"{size_bytes:.2f} PB"
+
+
+def min_reasonable_size(height):
+    i = bisect_right(_MIN_SIZE_HEIGHTS, height) - 1
+    return _MIN_SIZE_BYTES[i] if i >= 0 else _MIN_SIZE_FALLBACK
+
+
+def is_reasonable(filesize, height):
+    if not filesize or not height:
+        return False
+    return filesize >= min_reasonable_size(height)
+
+
+class FormatTable:
+    """yt-dlp formats stored column-wise for cheap classification and ranking.
+
+    Numeric fields live in typed arrays; only the formats that end up in a
+    result are turned back into dicts.
+    """
+
+    __slots__ = ("ids", "exts", "notes", "widths", "heights", "filesizes", "flags")
+
+    def __init__(self):
+        self.ids = []
+        self.exts = []
+        self.notes = []
+        self.widths = array('l')
+        self.heights = array('l')
+        self.filesizes = array('q')
+        self.flags = array('B')
+
+    @classmethod
+    def from_formats(cls, formats):
+        table = cls()
+        for f in formats:
+            table.add(f)
+        return table
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, f):
+        fmt_id = f.get("format_id")
+        if not fmt_id:
+            return False
+        flags = 0
+        if f.get("vcodec") != "none":
+            flags |= HAS_VIDEO
+        if f.get("acodec") != "none":
+            flags |= HAS_AUDIO
+        self.ids.append(fmt_id)
+        self.exts.append(f.get("ext", "unknown"))
+        self.notes.append((f.get("format_note") or "").lower())
+        self.widths.append(int(f.get("width") or 0))
+        self.heights.append(int(f.get("height") or 0))
+        self.filesizes.append(int(f.get("filesize") or f.get("filesize_approx") or 0))
+        self.flags.append(flags)
+        return True
+
+    def row(self, i):
+        width, height = self.widths[i], self.heights[i]
+        filesize = self.filesizes[i]
+        return {
+            "id": self.ids[i],
+            "ext": self.exts[i],
+            "res": f"{width}x{height}" if width and height else self.notes[i],
+            "height": height,
+            "width": width,
+            "filesize": filesize,
+            "size_str": readable_size(filesize),
+            "format_note": self.notes[i],
+        }
+
+    def available_heights(self):
+        """Distinct heights of all video-bearing formats, highest first."""
+        heights = {h for h, fl in zip(self.heights, self.flags) if h and fl & HAS_VIDEO}
+        return sorted(heights, reverse=True)
+
+    def classify(self):
+        """Split formats with a known size into allowed/blocked muxed, video-only and audio-only."""
+        allowed, blocked, audio = [], [], []
+        video_by_res = {}
+        heights, widths, sizes = self.heights, self.widths, self.filesizes
+        for i, fl in enumerate(self.flags):
+            size = sizes[i]
+            if not size:
+                continue
+            if fl == HAS_VIDEO | HAS_AUDIO:
+                h = heights[i]
+                (allowed if h and size >= min_reasonable_size(h) else blocked).append(i)
+            elif fl & HAS_VIDEO:
+                key = (widths[i], heights[i])
+                prev = video_by_res.get(key)
+                if prev is None or size > sizes[prev]:
+                    video_by_res[key] = i
+            elif fl & HAS_AUDIO:
+                note = self.notes[i]
+                if "low" in note or "tiny" in note:
+                    continue
+                audio.append(i)
+
+        by_height = heights.__getitem__
+        return FormatClasses(
+            allowed=[self.row(i) for i in sorted(allowed, key=by_height, reverse=True)],
+            blocked=[self.row(i) for i in sorted(blocked, key=by_height, reverse=True)],
+            video_only=[self.row(i) for i in sorted(video_by_res.values(), key=by_height, reverse=True)],
+            audio_only=[self.row(i) for i in sorted(audio, key=sizes.__getitem__, reverse=True)],
+        )
+
+
+def classify_formats(formats):
+    return FormatTable.from_formats(formats).classify()
+
+
+def valid_format_ids(classes):
+    return [f["id"] for f in classes.allowed + classes.video_only + classes.audio_only]
+
+
+def print_formats(classes, bullet=""):
+    def printer(title, lst, blocked=False):
+        status = " (Not downloadable)" if blocked else ""
+        print(f"\n{bullet} {title}{status} ({len(lst)} formats):")
+        for f in lst:
+            print(f"[{f['id']}] {f['res']} - {f['ext']} - {f['size_str']}")
+
+    printer("Video + Audio (Allowed)", classes.allowed)
+    printer("Video + Audio (Blocked)", classes.blocked, blocked=True)
+    printer("Video Only", classes.video_only)
+    printer("Audio Only", classes.audio_only)
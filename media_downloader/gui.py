@@ -0,0 +1,369 @@
+"""Tk front end. Importing this module loads Tk; PIL is loaded for the first thumbnail."""
+
+import io
+import os
+import sys
+import threading
+import tkinter as tk
+from tkinter import filedialog
+from tkinter import font as tkfont
+from tkinter import scrolledtext
+from tkinter import ttk
+
+from .batch import cookiefile_for
+from .cache import download_with_info, extract_info_cached
+from .format_table import FormatTable
+
+Image = ImageTk = None
+PIL_AVAILABLE = None
+
+
+def load_pil():
+    """Import PIL on first use; returns whether thumbnails can be shown."""
+    global Image, ImageTk, PIL_AVAILABLE
+    if PIL_AVAILABLE is None:
+        try:
+            from PIL import Image, ImageTk
+            PIL_AVAILABLE = True
+        except Exception:
+            PIL_AVAILABLE = False
+    return PIL_AVAILABLE
+
+
+class MediaDownloaderApp:
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        self.root.title("Media Downloader")
+        try:
+            self.root.iconbitmap(default="")
+        except Exception:
+            pass
+
+        self.primary = "#3b28cc"
+        self.secondary = "#6247aa"
+        self.bg = "#ffffff"
+        self.text_fg = "#000000"
+        self.accent = self.primary
+        self.error = "#ff4d6d"
+
+        self._configure_root()
+        self._init_vars()
+        self._setup_style()
+        self._build_ui()
+
+    def _configure_root(self):
+        self.root.configure(bg=self.bg)
+        self.root.minsize(800, 520)
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+
+    def _init_vars(self):
+        self.url_var = tk.StringVar()
+        self.type_var = tk.StringVar(value="both")
+        self.quality_var = tk.StringVar(value="Best available")
+        self.filename_var = tk.StringVar()
+        self.dir_var = tk.StringVar(value=os.getcwd())
+
+    def _setup_style(self):
+        style = ttk.Style()
+        try:
+            base_font = ("Zalando Sans SemiExpanded", 10)
+            tkfont.nametofont("TkDefaultFont").configure(family="Zalando Sans SemiExpanded", size=10)
+        except Exception:
+            base_font = ("Segoe UI", 10)
+        style.theme_use("clam")
+
+        style.configure("TFrame", background=self.bg)
+        style.configure("TLabel", background=self.bg, foreground=self.text_fg, font=base_font)
+        style.configure("TEntry", foreground=self.text_fg, insertcolor=self.text_fg)
+        style.configure("TCombobox")
+        style.map("TCombobox",
+                  fieldbackground=[("readonly", self.bg)],
+                  foreground=[("readonly", self.text_fg)])
+        style.configure("Primary.TButton", background=self.primary, foreground=self.text_fg, padding=8)
+        style.map("Primary.TButton",
+                  background=[("active", self.secondary)])
+        style.configure("Accent.TLabel", background=self.bg, foreground=self.accent)
+        style.configure("Error.TLabel", background=self.bg, foreground=self.error)
+        style.configure("Horizontal.TProgressbar", troughcolor="#e9e9ef", background=self.accent)
+        try:
+            self.title_font = tkfont.Font(family="Delius", size=24, weight="bold")
+        except Exception:
+            self.title_font = tkfont.Font(family="Segoe UI", size=24, weight="bold")
+        try:
+            self.welcome_font = tkfont.Font(family="Delius", size=12)
+        except Exception:
+            self.welcome_font = tkfont.Font(family="Segoe UI", size=12)
+
+    def _build_ui(self):
+        outer = ttk.Frame(self.root, padding=12)
+        outer.grid(row=0, column=0, sticky="nsew")
+        outer.columnconfigure(0, weight=1)
+        outer.rowconfigure(0, weight=1)
+
+        canvas = tk.Canvas(outer, bg=self.bg, highlightthickness=0)
+        vbar = ttk.Scrollbar(outer, orient="vertical", command=canvas.yview)
+        self.content = ttk.Frame(canvas, padding=16)
+        self.content.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        win = canvas.create_window((0, 0), window=self.content, anchor="nw")
+        # Keep a reference to canvas for scrolling
+        self.canvas = canvas
+        # Ensure content resizes with canvas width
+        def _sync_content_width(event):
+            try:
+                canvas.itemconfigure(win, width=event.width)
+            except Exception:
+                pass
+        canvas.bind("<Configure>", _sync_content_width)
+        # Enable mouse wheel scrolling
+        self._enable_mousewheel(canvas)
+        canvas.configure(yscrollcommand=vbar.set)
+        canvas.grid(row=0, column=0, sticky="nsew")
+        vbar.grid(row=0, column=1, sticky="ns")
+        outer.rowconfigure(0, weight=1)
+        outer.columnconfigure(0, weight=1)
+
+        header = ttk.Frame(self.content)
+        header.grid(row=0, column=0, sticky="ew", pady=(0, 16))
+        header.columnconfigure(0, weight=1)
+        title_lbl = ttk.Label(header, text="Media Downloader", foreground=self.primary)
+        title_lbl.configure(font=self.title_font)
+        title_lbl.grid(row=0, column=0, sticky="n", pady=(0, 4))
+        welcome_lbl = ttk.Label(header, text="Download videos and audio in a clean, modern UI")
+        welcome_lbl.configure(font=self.welcome_font)
+        welcome_lbl.grid(row=1, column=0, sticky="n")
+
+        url_card = ttk.Frame(self.content)
+        url_card.grid(row=1, column=0, sticky="ew", pady=(0, 12))
+        for i in range(3):
+            url_card.columnconfigure(i, weight=1 if i == 1 else 0)
+        ttk.Label(url_card, text="YouTube URL").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        self.url_entry = ttk.Entry(url_card, textvariable=self.url_var)
+        self.url_entry.grid(row=0, column=1, sticky="ew")
+        fetch_btn = ttk.Button(url_card, text="Fetch Details", style="Primary.TButton", command=self._fetch_details)
+        fetch_btn.grid(row=0, column=2, padx=(8, 0))
+
+        self.card_frame = ttk.Frame(self.content, padding=16)
+        self.card_frame.grid(row=2, column=0, sticky="ew")
+        self.card_frame.grid_remove()
+        self.card_frame.columnconfigure(0, weight=1)
+        self.title_var = tk.StringVar()
+        self.video_title_lbl = ttk.Label(self.card_frame, textvariable=self.title_var, font=("Segoe UI", 12, "bold"))
+        self.video_title_lbl.grid(row=0, column=0, sticky="w", pady=(0, 8))
+        self.thumb_label = ttk.Label(self.card_frame)
+        self.thumb_label.grid(row=1, column=0, sticky="n", pady=(0, 8))
+        qrow = ttk.Frame(self.card_frame)
+        qrow.grid(row=2, column=0, sticky="ew", pady=(0, 8))
+        qrow.columnconfigure(1, weight=1)
+        ttk.Label(qrow, text="Quality").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        self.quality_cb = ttk.Combobox(qrow, textvariable=self.quality_var, state="readonly", values=["Best available", "Audio best"]) 
+        self.quality_cb.grid(row=0, column=1, sticky="ew")
+        # Type selection
+        trow = ttk.Frame(self.card_frame)
+        trow.grid(row=3, column=0, sticky="ew", pady=(0, 8))
+        trow.columnconfigure(1, weight=1)
+        ttk.Label(trow, text="Type").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        self.type_cb = ttk.Combobox(trow, textvariable=self.type_var, state="readonly", values=["both", "video", "audio"]) 
+        self.type_cb.grid(row=0, column=1, sticky="ew")
+        # Filename and folder selector
+        nrow = ttk.Frame(self.card_frame)
+        nrow.grid(row=4, column=0, sticky="ew", pady=(0, 8))
+        nrow.columnconfigure(1, weight=1)
+        ttk.Label(nrow, text="Filename").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        self.name_entry = ttk.Entry(nrow, textvariable=self.filename_var)
+        self.name_entry.grid(row=0, column=1, sticky="ew")
+        drow = ttk.Frame(self.card_frame)
+        drow.grid(row=5, column=0, sticky="ew", pady=(0, 8))
+        drow.columnconfigure(1, weight=1)
+        ttk.Label(drow, text="Folder").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        self.dir_entry = ttk.Entry(drow, textvariable=self.dir_var)
+        self.dir_entry.grid(row=0, column=1, sticky="ew")
+        browse_btn = ttk.Button(drow, text="Browse...", command=self._choose_directory)
+        browse_btn.grid(row=0, column=2, padx=(8, 0))
+        bottom = ttk.Frame(self.card_frame)
+        bottom.grid(row=6, column=0, sticky="ew")
+        bottom.columnconfigure(0, weight=1)
+        self.progress = ttk.Progressbar(bottom, orient="horizontal", mode="determinate")
+        self.progress.grid(row=0, column=0, sticky="ew", pady=(0, 8))
+        dl_btn = ttk.Button(bottom, text="Download", style="Primary.TButton", command=self._start_download)
+        dl_btn.grid(row=1, column=0, sticky="e")
+
+        log_section = ttk.Frame(self.content)
+        log_section.grid(row=3, column=0, sticky="nsew", pady=(12, 0))
+        log_section.columnconfigure(0, weight=1)
+        self.log_widget = scrolledtext.ScrolledText(log_section, height=6, bg="#f5f5fb", fg=self.text_fg,
+                                                   insertbackground=self.text_fg, relief="flat", padx=8, pady=8)
+        self.log_widget.grid(row=0, column=0, sticky="nsew")
+        self._log("Ready.")
+
+    def _log(self, msg):
+        if hasattr(self, 'log_widget'):
+            self.log_widget.insert("end", f"{msg}\n")
+            self.log_widget.see("end")
+
+    def _enable_mousewheel(self, widget):
+        # Windows and MacOS
+        def _on_mousewheel(event):
+            delta = event.delta
+            if delta == 0:
+                return
+            step = -1 if delta > 0 else 1
+            try:
+                self.canvas.yview_scroll(step, "units")
+            except Exception:
+                pass
+        widget.bind_all("<MouseWheel>", _on_mousewheel)
+        # Linux (X11)
+        widget.bind_all("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind_all("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    # No-op resize handler retained for future responsive hooks if needed
+    def _on_root_resize(self, event):
+        return
+
+    def _paste_from_clipboard(self):
+        try:
+            text = self.root.clipboard_get()
+            self.url_var.set(text)
+            self._log("Pasted URL from clipboard.")
+        except Exception:
+            self._log("No text in clipboard.")
+
+    def _choose_directory(self):
+        path = filedialog.askdirectory(initialdir=self.dir_var.get() or os.getcwd(), mustexist=True)
+        if path:
+            self.dir_var.set(path)
+            self._log(f"Directory set to: {path}")
+
+    def _fetch_details(self):
+        url = self.url_var.get().strip()
+        if not url:
+            self._log("Please enter a URL.")
+            return
+        self._log("Fetching details...")
+        def worker():
+            import yt_dlp
+            try:
+                with yt_dlp.YoutubeDL({"quiet": True, "cookiefile": cookiefile_for(url)}) as ydl:
+                    info = extract_info_cached(ydl, url)
+            except Exception as e:
+                self.root.after(0, self._log, f"Error fetching: {e}")
+                return
+            title = info.get("title") or "Untitled"
+            thumb_url = info.get("thumbnail")
+            table = FormatTable.from_formats(info.get("formats") or [])
+            qvals = ["Best available"] + [f"{h}p" for h in table.available_heights()] + ["Audio best"]
+            img_data = None
+            if thumb_url:
+                import urllib.request
+                try:
+                    with urllib.request.urlopen(thumb_url) as r:
+                        img_data = r.read()
+                except Exception:
+                    img_data = None
+            def ui_update():
+                self.title_var.set(title)
+                safe_name = ''.join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+                self.filename_var.set(safe_name)
+                self.quality_cb.configure(values=qvals)
+                self.quality_var.set(qvals[0] if qvals else "Best available")
+                if img_data and load_pil():
+                    try:
+                        img = Image.open(io.BytesIO(img_data))
+                        w, h = img.size
+                        max_w = 480
+                        if w > max_w:
+                            ratio = max_w / float(w)
+                            img = img.resize((int(w*ratio), int(h*ratio)), Image.LANCZOS)
+                        self._thumb_photo = ImageTk.PhotoImage(img)
+                        self.thumb_label.configure(image=self._thumb_photo)
+                    except Exception:
+                        self.thumb_label.configure(text="Thumbnail unavailable")
+                else:
+                    self.thumb_label.configure(text="Thumbnail unavailable")
+                self.card_frame.grid()
+                self._log("Details loaded.")
+            self.root.after(0, ui_update)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _start_download(self):
+        url = self.url_var.get().strip()
+        if not url:
+            self._log("Please enter a URL.")
+            return
+        dtype = self.type_var.get()
+        quality = self.quality_var.get()
+        fname = self.filename_var.get().strip()
+        outdir = self.dir_var.get().strip()
+        self._log(f"Requested: type={dtype}, quality={quality}, filename={fname or '(auto)'}")
+        self._log(f"Saving to: {outdir}")
+        self.progress.configure(mode="determinate", value=0, maximum=100)
+        t = threading.Thread(target=self._download_worker, args=(url, dtype, quality, fname, outdir), daemon=True)
+        t.start()
+
+    def _set_progress(self, value):
+        try:
+            self.progress.configure(mode="determinate")
+            self.progress['value'] = max(0, min(100, value))
+        except Exception:
+            pass
+
+    def _download_worker(self, url, dtype, quality, fname, outdir):
+        fmt = self._format_string(dtype, quality)
+        if not os.path.isdir(outdir):
+            try:
+                os.makedirs(outdir, exist_ok=True)
+            except Exception:
+                pass
+        if fname:
+            outtmpl = os.path.join(outdir, f"{fname}.%(ext)s")
+        else:
+            outtmpl = os.path.join(outdir, '%(title)s.%(ext)s')
+        ydl_opts = {
+            'format': fmt,
+            'outtmpl': outtmpl,
+            'merge_output_format': 'mp4',
+            'noplaylist': True,
+            'quiet': True,
+            'cookiefile': cookiefile_for(url),
+            'progress_hooks': [self._progress_hook],
+        }
+        self.root.after(0, lambda: self._log(f"Starting download ({fmt})..."))
+        try:
+            from .chunked_download import ResumableYoutubeDL
+            with ResumableYoutubeDL(ydl_opts) as ydl:
+                download_with_info(ydl, url)
+        except Exception as e:
+            self.root.after(0, self._log, f"Download failed: {e}")
+            return
+        self.root.after(0, lambda: self._set_progress(100))
+        self.root.after(0, lambda: self._log("Download complete."))
+
+    def _progress_hook(self, d):
+        if d.get('status') != 'downloading':
+            return
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        downloaded = d.get('downloaded_bytes') or 0
+        if total:
+            pct = downloaded * 100.0 / total
+            self.root.after(0, lambda: self._set_progress(pct))
+
+    def _format_string(self, dtype, quality):
+        if dtype == "audio" or quality == "Audio best":
+            return "bestaudio/best"
+        height = quality[:-1] if quality.endswith('p') and quality[:-1].isdigit() else None
+        limit = f"[height<={height}]" if height else ""
+        if dtype == "video":
+            return f"bestvideo{limit}/best{limit}"
+        return f"bestvideo{limit}+bestaudio/best{limit}"
+
+
+def run_gui():
+    root = tk.Tk()
+    MediaDownloaderApp(root)
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_gui())
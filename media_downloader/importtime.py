@@ -0,0 +1,148 @@
+"""Cold-start import benchmark for the media_downloader entry points.
+
+Every target is imported in a fresh interpreter under `python -X importtime`,
+several times, and the median cumulative import time is reported, along with
+the heaviest modules it pulled in. Results can be saved as JSON and compared
+against a saved baseline, so start-up regressions show up in CI:
+
+  python -m media_downloader.importtime
+  python -m media_downloader.importtime --save importtime.json
+  python -m media_downloader.importtime --compare importtime.json --max-regression 25
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+DEFAULT_TARGETS = [
+    "media_downloader",
+    "media_downloader.cli",
+    "media_downloader.batch",
+    "media_downloader.gui",
+    "Downloader",
+    # Reference points: what the entry points used to load up front
+    "yt_dlp",
+    "tkinter",
+]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once(target):
+    """Import `target` in a new interpreter; returns ({module: cumulative us}, target cumulative us)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                          cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1:] or ["import failed"]
+        raise RuntimeError(f"{target}: {error[0]}")
+    modules = {}
+    total = 0
+    # -X importtime lists a module after everything it imported, so the lines
+    # before each top-level entry are that entry's dependencies
+    block = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        block[name] = cumulative
+        if indent > 1:
+            continue
+        # Top-level imports of `import target` are the target and its parent packages;
+        # anything else at the top level was loaded by interpreter start-up (site, encodings)
+        if name == target or target.startswith(name + "."):
+            modules.update(block)
+            total += cumulative
+        block = {}
+    return modules, total
+
+
+def measure(target, runs=5, top=5):
+    totals = []
+    heaviest = {}
+    for _ in range(runs):
+        modules, total = measure_once(target)
+        totals.append(total)
+        for name, cumulative in modules.items():
+            heaviest.setdefault(name, []).append(cumulative)
+    children = sorted(((statistics.median(v), k) for k, v in heaviest.items()
+                       if k != target and not target.startswith(k + ".")), reverse=True)[:top]
+    return {
+        "median_ms": round(statistics.median(totals) / 1000, 2),
+        "min_ms": round(min(totals) / 1000, 2),
+        "modules": len(heaviest),
+        "heaviest": [[name, round(us / 1000, 2)] for us, name in children],
+    }
+
+
+def print_results(results, baseline=None):
+    print(f"{'Target':<26}{'Median (ms)':>12}{'Min (ms)':>10}{'Modules':>9}"
+          + (f"{'Baseline':>10}{'Change':>9}" if baseline else ""))
+    for target, r in results.items():
+        line = f"{target:<26}{r['median_ms']:>12.1f}{r['min_ms']:>10.1f}{r['modules']:>9}"
+        base = (baseline or {}).get(target)
+        if base:
+            change = (r["median_ms"] - base["median_ms"]) / base["median_ms"] * 100 if base["median_ms"] else 0.0
+            line += f"{base['median_ms']:>10.1f}{change:>+8.0f}%"
+        print(line)
+        heavy = ", ".join(f"{name} {ms:.0f}ms" for name, ms in r["heaviest"] if ms >= 1)
+        if heavy:
+            print(f"    {heavy}")
+
+
+def regressions(results, baseline, max_regression):
+    """Targets whose median grew by more than `max_regression` percent (and at least 2 ms)."""
+    failed = []
+    for target, r in results.items():
+        base = baseline.get(target)
+        if not base:
+            continue
+        grown = r["median_ms"] - base["median_ms"]
+        if grown > 2 and grown > base["median_ms"] * max_regression / 100:
+            failed.append(target)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of the media_downloader entry points")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target (default: 5)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imported modules to list per target")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against results saved with --save")
+    parser.add_argument("--max-regression", type=float, default=25.0,
+                        help="With --compare, exit 1 when a target got this many percent slower")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for target in args.targets:
+        try:
+            results[target] = measure(target, args.runs, args.top)
+        except RuntimeError as e:
+            print(f" Skipped {e}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+        print(f" Saved to {args.save}")
+    if baseline:
+        failed = regressions(results, baseline, args.max_regression)
+        if failed:
+            print(f" Slower than baseline by more than {args.max_regression:.0f}%: {', '.join(failed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""Pluggable speech recognition backends.
+
+Every backend turns a `speech_recognition.AudioData` into text and raises the
+same exceptions as `Recognizer.recognize_google` (UnknownValueError when
+nothing was understood, RequestError when the engine failed), so callers can
+swap engines without changing their error handling:
+
+    google   Google Web Speech API (online, no model to load)
+    vosk     Vosk/Kaldi, fully offline (pip install vosk, plus a model directory)
+    whisper  faster-whisper (CTranslate2), offline (pip install faster-whisper)
+
+Local models are loaded once when the backend is created and then reused for
+every utterance. The engine is chosen with load_backend(name) or the
+SPEECH_BACKEND environment variable.
+
+backend.stream() starts an incremental recognition of one utterance: raw
+16 kHz PCM is fed in as it is captured, partial hypotheses come back along the
+way (vosk natively, whisper by re-decoding in the background, google not at
+all) and finish() returns the final text (see streaming_asr.py).
+
+Benchmark the backends on a folder of WAV files (real-time factor = processing
+time / audio duration, lower is faster):
+  python recognizers.py bench fixtures/ --backends google vosk whisper
+"""
+
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+import wave
+from typing import Optional
+
+import speech_recognition as sr
+
+# Local engines work on 16 kHz, 16-bit mono audio
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class RecognizerBackend:
+    name = ""
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        raise NotImplementedError
+
+    def stream(self) -> "RecognitionStream":
+        return RecognitionStream(self)
+
+
+class RecognitionStream:
+    """One utterance fed in chunk by chunk; this default just buffers until finish()."""
+
+    def __init__(self, backend: RecognizerBackend):
+        self.backend = backend
+        self.chunks = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """Add 16 kHz 16-bit mono audio; returns the current partial hypothesis, if any."""
+        self.chunks.append(pcm)
+        return None
+
+    def audio(self) -> sr.AudioData:
+        return sr.AudioData(b"".join(self.chunks), SAMPLE_RATE, SAMPLE_WIDTH)
+
+    def finish(self) -> str:
+        return self.backend.transcribe(self.audio())
+
+
+class GoogleBackend(RecognizerBackend):
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class VoskBackend(RecognizerBackend):
+    name = "vosk"
+
+    def __init__(self, model_path: str = None):
+        try:
+            import vosk
+        except ImportError:
+            raise ImportError("The vosk backend needs the vosk package: pip install vosk")
+        vosk.SetLogLevel(-1)
+        model_path = model_path or os.getenv("VOSK_MODEL_PATH")
+        # Without a path vosk downloads (once) and loads its small English model
+        self.model = vosk.Model(model_path) if model_path else vosk.Model(lang="en-us")
+        self._recognizer_class = vosk.KaldiRecognizer
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        recognizer = self._recognizer_class(self.model, SAMPLE_RATE)
+        try:
+            recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH))
+            text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        except Exception as e:
+            raise sr.RequestError(f"vosk failed: {e}")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def stream(self) -> RecognitionStream:
+        return VoskStream(self)
+
+
+class VoskStream(RecognitionStream):
+    """Decodes while audio arrives, so finish() only has the last few frames left."""
+
+    def __init__(self, backend: VoskBackend):
+        super().__init__(backend)
+        self.recognizer = backend._recognizer_class(backend.model, SAMPLE_RATE)
+        self.final_parts = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(pcm):
+            # Vosk found an internal pause; keep that segment and start a new one
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.final_parts.append(text)
+            return " ".join(self.final_parts) or None
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.final_parts + ([partial] if partial else [])) or None
+
+    def finish(self) -> str:
+        try:
+            text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        except Exception as e:
+            raise sr.RequestError(f"vosk failed: {e}")
+        text = " ".join(self.final_parts + ([text] if text else [])).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class WhisperBackend(RecognizerBackend):
+    name = "whisper"
+
+    def __init__(self, model_size: str = None, device: str = "cpu", compute_type: str = "int8",
+                 language: str = "en"):
+        try:
+            from faster_whisper import WhisperModel
+            import numpy
+        except ImportError:
+            raise ImportError("The whisper backend needs faster-whisper: pip install faster-whisper")
+        self._numpy = numpy
+        self.language = language
+        self.model = WhisperModel(model_size or os.getenv("WHISPER_MODEL", "base.en"),
+                                  device=device, compute_type=compute_type)
+
+    def transcribe(self, audio: sr.AudioData) -> str:
+        raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+        samples = self._numpy.frombuffer(raw, dtype=self._numpy.int16).astype(self._numpy.float32) / 32768.0
+        try:
+            segments, _ = self.model.transcribe(samples, language=self.language, beam_size=1,
+                                                vad_filter=True)
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+        except Exception as e:
+            raise sr.RequestError(f"whisper failed: {e}")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def stream(self) -> RecognitionStream:
+        return WhisperStream(self)
+
+
+class WhisperStream(RecognitionStream):
+    """Whisper has no incremental decoder: partials come from re-decoding the
+    buffer in a background thread every `partial_every` seconds of new audio."""
+
+    def __init__(self, backend: WhisperBackend, partial_every: float = 1.0):
+        super().__init__(backend)
+        self.partial_every_bytes = int(partial_every * SAMPLE_RATE * SAMPLE_WIDTH)
+        self.buffered = 0
+        self.decoded_at = 0
+        self.partial = None
+        self.worker = None
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        super().accept(pcm)
+        self.buffered += len(pcm)
+        idle = self.worker is None or not self.worker.is_alive()
+        if idle and self.buffered - self.decoded_at >= self.partial_every_bytes:
+            self.decoded_at = self.buffered
+            self.worker = threading.Thread(target=self._decode_partial, args=(self.audio(),), daemon=True)
+            self.worker.start()
+        return self.partial
+
+    def _decode_partial(self, audio: sr.AudioData):
+        try:
+            self.partial = self.backend.transcribe(audio)
+        except (sr.UnknownValueError, sr.RequestError):
+            pass
+
+    def finish(self) -> str:
+        if self.worker is not None:
+            self.worker.join()
+        return super().finish()
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "whisper": WhisperBackend,
+}
+
+
+def load_backend(name: str = None, **options) -> RecognizerBackend:
+    """Create (and load the model of) a backend; defaults to $SPEECH_BACKEND, then google."""
+    name = (name or os.getenv("SPEECH_BACKEND") or "google").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech backend '{name}' (choose from: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
+
+
+# ------------------ Benchmark ------------------
+def wav_duration(path: str) -> float:
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def benchmark(backend: RecognizerBackend, files):
+    """Transcribe every file; returns per-file (path, duration, seconds, text or error)."""
+    results = []
+    for path in files:
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        started = time.perf_counter()
+        try:
+            text = backend.transcribe(audio)
+        except sr.UnknownValueError:
+            text = "<not understood>"
+        except sr.RequestError as e:
+            text = f"<error: {e}>"
+        results.append((path, wav_duration(path), time.perf_counter() - started, text))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speech recognition backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Compare real-time factor across backends on WAV files")
+    bench.add_argument("folder", help="Folder of .wav fixtures")
+    bench.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS),
+                       help="Backends to compare (default: all)")
+    bench.add_argument("--verbose", action="store_true", help="Print every transcript")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.folder, "*.wav")))
+    if not files:
+        print(f"❌ No .wav files in {args.folder}")
+        return
+
+    audio_seconds = sum(wav_duration(f) for f in files)
+    print(f"🎧 {len(files)} files, {audio_seconds:.1f}s of audio\n")
+    print(f"{'Backend':<10}{'Load (s)':>10}{'Process (s)':>13}{'RTF':>8}{'Failed':>8}")
+    for name in args.backends:
+        started = time.perf_counter()
+        try:
+            backend = load_backend(name)
+        except Exception as e:
+            print(f"{name:<10}  unavailable: {e}")
+            continue
+        load_seconds = time.perf_counter() - started
+
+        results = benchmark(backend, files)
+        process_seconds = sum(r[2] for r in results)
+        failed = sum(1 for r in results if r[3].startswith("<"))
+        print(f"{name:<10}{load_seconds:>10.2f}{process_seconds:>13.2f}"
+              f"{process_seconds / audio_seconds:>8.3f}{failed:>8}")
+        if args.verbose:
+            for path, duration, seconds, text in results:
+                print(f"    {os.path.basename(path)} ({duration:.1f}s, {seconds:.2f}s): {text}")
+
+
+if __name__ == "__main__":
+    main()
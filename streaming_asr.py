@@ -0,0 +1,166 @@
+"""Streaming microphone capture with voice-activity detection.
+
+Instead of recording a whole phrase and only then recognising it, the
+listener reads the microphone in 30 ms frames, decides per frame whether
+someone is speaking and hands speech frames to the recognizer as they arrive
+(see RecognitionStream in recognizers.py). Speech ends after a short run of
+silent frames, so text is ready a fraction of a second after the speaker stops.
+
+Ambient noise is measured once per listener and then tracked slowly from the
+frames that are not speech, so there is no calibration pause on every turn.
+
+    listener = StreamingListener(load_backend("vosk"))
+    with listener.microphone() as source:
+        text = listener.listen(source, on_partial=print)
+"""
+
+import collections
+import itertools
+import math
+import time
+from array import array
+from typing import Callable, Iterable, Optional
+
+import speech_recognition as sr
+
+from recognizers import SAMPLE_RATE, RecognizerBackend
+
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+def frame_rms(frame: bytes) -> float:
+    samples = array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyVAD:
+    """Frame-level speech detector on RMS energy above an adaptive noise floor.
+
+    A frame counts as speech when its energy is `ratio` times the noise floor
+    (and above `min_energy`). The floor is set by calibrate() and afterwards
+    follows non-speech frames with weight `adapt`, so it tracks a room getting
+    noisier or quieter without reacting to the speaker.
+    """
+
+    def __init__(self, ratio: float = 3.0, min_energy: float = 150.0, adapt: float = 0.02):
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adapt = adapt
+        self.noise = None
+
+    @property
+    def calibrated(self) -> bool:
+        return self.noise is not None
+
+    def calibrate(self, frames: Iterable[bytes]):
+        levels = [frame_rms(frame) for frame in frames]
+        self.noise = sum(levels) / len(levels) if levels else self.min_energy / self.ratio
+
+    def threshold(self) -> float:
+        return max(self.min_energy, (self.noise or 0.0) * self.ratio)
+
+    def is_speech(self, frame: bytes) -> bool:
+        level = frame_rms(frame)
+        if self.noise is None:
+            self.noise = level
+        speech = level > self.threshold()
+        if not speech:
+            self.noise += self.adapt * (level - self.noise)
+        return speech
+
+
+class StreamingListener:
+    """Captures one utterance at a time and recognises it while it is spoken.
+
+    Keep one listener per session: the backend's model and the VAD's noise
+    estimate are reused across turns.
+    """
+
+    def __init__(self, backend: RecognizerBackend, vad: Optional[EnergyVAD] = None,
+                 start_ms: int = 90, end_ms: int = 450, preroll_ms: int = 300, calibrate_ms: int = 500):
+        self.backend = backend
+        self.vad = vad or EnergyVAD()
+        self.start_frames = max(1, start_ms // FRAME_MS)
+        self.end_frames = max(1, end_ms // FRAME_MS)
+        self.preroll_frames = max(self.start_frames, preroll_ms // FRAME_MS)
+        self.calibrate_frames = max(1, calibrate_ms // FRAME_MS)
+        # Seconds from deciding speech has ended to having the final text, last utterance
+        self.last_latency = None
+
+    @staticmethod
+    def microphone(device_index: Optional[int] = None) -> sr.Microphone:
+        """A microphone that delivers 16 kHz mono in 30 ms chunks, the format the backends expect."""
+        return sr.Microphone(device_index=device_index, sample_rate=SAMPLE_RATE, chunk_size=FRAME_SAMPLES)
+
+    @staticmethod
+    def frames(source) -> Iterable[bytes]:
+        """Read frames from an open sr.Microphone until the caller stops."""
+        while True:
+            yield source.stream.read(FRAME_SAMPLES)
+
+    def listen(self, source, timeout: Optional[float] = 5, phrase_time_limit: Optional[float] = 10,
+               on_partial: Optional[Callable[[str], None]] = None) -> str:
+        return self.listen_frames(self.frames(source), timeout, phrase_time_limit, on_partial)
+
+    def listen_frames(self, frames: Iterable[bytes], timeout: Optional[float] = 5,
+                      phrase_time_limit: Optional[float] = 10,
+                      on_partial: Optional[Callable[[str], None]] = None) -> str:
+        """Recognise the next utterance in `frames` (16 kHz, 16-bit, FRAME_MS each).
+
+        Raises sr.WaitTimeoutError when nobody starts speaking within `timeout`
+        seconds of audio, and the backend's UnknownValueError/RequestError.
+        """
+        frames = iter(frames)
+        if not self.vad.calibrated:
+            noise = list(itertools.islice(frames, self.calibrate_frames))
+            if len(noise) < self.calibrate_frames:
+                raise sr.WaitTimeoutError("audio ended before a phrase started")
+            self.vad.calibrate(noise)
+
+        # Wait for speech, keeping a little audio from just before it starts
+        preroll = collections.deque(maxlen=self.preroll_frames)
+        voiced = waited = 0
+        for frame in frames:
+            preroll.append(frame)
+            voiced = voiced + 1 if self.vad.is_speech(frame) else 0
+            if voiced >= self.start_frames:
+                break
+            waited += 1
+            if timeout is not None and waited * FRAME_MS / 1000 >= timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        else:
+            raise sr.WaitTimeoutError("audio ended before a phrase started")
+
+        stream = self.backend.stream()
+        partial = None
+
+        def feed(chunk):
+            nonlocal partial
+            hypothesis = stream.accept(chunk)
+            if hypothesis and hypothesis != partial:
+                partial = hypothesis
+                if on_partial:
+                    on_partial(hypothesis)
+
+        for frame in preroll:
+            feed(frame)
+
+        # Stream speech to the recognizer until a run of silence ends it
+        max_frames = None if phrase_time_limit is None else int(phrase_time_limit * 1000 / FRAME_MS)
+        spoken = len(preroll)
+        silent = 0
+        for frame in frames:
+            feed(frame)
+            spoken += 1
+            silent = 0 if self.vad.is_speech(frame) else silent + 1
+            if silent >= self.end_frames or (max_frames is not None and spoken >= max_frames):
+                break
+
+        ended = time.perf_counter()
+        try:
+            return stream.finish()
+        finally:
+            self.last_latency = time.perf_counter() - ended
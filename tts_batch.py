@@ -0,0 +1,384 @@
+"""Batch text-to-speech for long documents and whole folders of .txt files.
+
+Each text is split into sentence chunks. The chunks are synthesized
+concurrently on a worker pool through a pluggable engine and appended to the
+output file in order as soon as the next chunk is ready, so the audio starts
+growing long before the whole document is done.
+
+    gtts     Google Translate TTS, MP3 (online)
+    pyttsx3  the system voice (SAPI5/NSSpeechSynthesizer/eSpeak), WAV, offline
+
+Finished chunks are kept next to the output in a `<output>.parts` folder
+until the document is complete. A rerun after a crash or a network error
+only synthesizes the chunks that were still in flight, and documents that
+are already complete are skipped. The exit status is 1 if any document failed.
+
+  python tts_batch.py docs/ audio/ --engine pyttsx3 --workers 4
+"""
+
+import argparse
+import glob
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from gtts import gTTS
+
+from tts_cache import AudioCache
+
+# gTTS itself sends at most 100 characters per request; bigger chunks just mean
+# fewer, longer tasks, smaller ones get the first audio out sooner
+CHUNK_CHARS = 300
+TTS_WORKERS = 4
+CHUNK_RETRIES = 3
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…。！？])["\')\]]*\s+')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+
+# ------------------ Chunking ------------------
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Break a sentence longer than `max_chars` at clause boundaries, then at spaces."""
+    pieces = []
+    for clause in _CLAUSE_END.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        if clause:
+            pieces.append(clause)
+    return pieces
+
+
+def split_sentences(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split text into chunks of whole sentences, each at most `max_chars` long.
+
+    Short sentences are packed together (fewer requests, natural pauses);
+    paragraph breaks always end a chunk.
+    """
+    chunks = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        current = ""
+        for sentence in _SENTENCE_END.split(paragraph):
+            for piece in ([sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars)):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+# ------------------ Engines ------------------
+class TTSEngine:
+    """Turns one chunk of text into audio bytes in the engine's `suffix` format.
+
+    `options` identify the voice, so chunks cached for one voice are never
+    reused for another. Engines whose library is not thread-safe set
+    `use_processes` and get one engine instance per worker process.
+    """
+    name = ""
+    suffix = ".mp3"
+    use_processes = False
+
+    @property
+    def options(self) -> dict:
+        return {}
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+class GTTSEngine(TTSEngine):
+    name = "gtts"
+    suffix = ".mp3"
+
+    def __init__(self, lang: str = "en", tld: str = "com", slow: bool = False):
+        self.lang = lang
+        self.tld = tld
+        self.slow = slow
+
+    @property
+    def options(self) -> dict:
+        return {"lang": self.lang, "tld": self.tld, "slow": self.slow}
+
+    def synthesize(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, tld=self.tld, slow=self.slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Engine(TTSEngine):
+    """Offline system voice. pyttsx3 drives one event loop per process, so
+    chunks run in worker processes rather than threads."""
+    name = "pyttsx3"
+    suffix = ".wav"
+    use_processes = True
+
+    def __init__(self, rate: Optional[int] = 150, voice: Optional[str] = None, volume: float = 0.9):
+        try:
+            import pyttsx3  # noqa: F401
+        except ImportError:
+            raise ImportError("The pyttsx3 engine needs the pyttsx3 package: pip install pyttsx3")
+        self.rate = rate
+        self.voice = voice
+        self.volume = volume
+        self._engine = None
+
+    @property
+    def options(self) -> dict:
+        return {"rate": self.rate, "voice": self.voice, "volume": self.volume}
+
+    def _init_engine(self):
+        import pyttsx3
+        engine = pyttsx3.init()
+        if self.voice:
+            engine.setProperty('voice', self.voice)
+        if self.rate:
+            engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+        return engine
+
+    def synthesize(self, text: str) -> bytes:
+        if self._engine is None:
+            self._engine = self._init_engine()
+        fd, path = tempfile.mkstemp(suffix=self.suffix)
+        os.close(fd)
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def __getstate__(self):
+        # The driver can't cross into a worker process; each one starts its own
+        return dict(self.__dict__, _engine=None)
+
+
+ENGINES = {
+    "gtts": GTTSEngine,
+    "pyttsx3": Pyttsx3Engine,
+}
+
+
+def load_engine(name: str = "gtts", **options) -> TTSEngine:
+    name = name.lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown TTS engine '{name}' (choose from: {', '.join(ENGINES)})")
+    return ENGINES[name](**options)
+
+
+# Worker processes keep the engine they were sent the first time
+_process_engine = None
+
+
+def _synthesize_chunk(engine: TTSEngine, text: str) -> bytes:
+    global _process_engine
+    if engine.use_processes:
+        if _process_engine is None or _process_engine.options != engine.options:
+            _process_engine = engine
+        engine = _process_engine
+    for attempt in range(CHUNK_RETRIES):
+        try:
+            return engine.synthesize(text)
+        except Exception:
+            if attempt == CHUNK_RETRIES - 1:
+                raise
+            time.sleep(min(2 ** attempt, 10))
+
+
+def make_pool(engine: TTSEngine, workers: int = TTS_WORKERS):
+    return ProcessPoolExecutor(workers) if engine.use_processes else ThreadPoolExecutor(workers)
+
+
+# ------------------ Output ------------------
+class AudioAppender:
+    """Appends chunk audio to one output file as it arrives.
+
+    MP3 is a stream of self-contained frames, so chunks are concatenated as
+    they are. For WAV the header comes from the first chunk and is patched
+    after every write, so the file is playable at any point.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_wav = path.lower().endswith(".wav")
+        self._file = open(path, "wb")
+        self._wav = None
+
+    def append(self, audio: bytes):
+        if not self.is_wav:
+            self._file.write(audio)
+            self._file.flush()
+            return
+        with wave.open(io.BytesIO(audio), "rb") as chunk:
+            if self._wav is None:
+                self._wav = wave.open(self._file, "wb")
+                self._wav.setparams(chunk.getparams())
+            self._wav.writeframes(chunk.readframes(chunk.getnframes()))
+        self._file.flush()
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+        self._file.close()
+
+
+def synthesize_text(text: str, output: str, engine: TTSEngine, pool=None, max_chars: int = CHUNK_CHARS,
+                    progress: Optional[Callable[[int, int], None]] = None, ahead: int = TTS_WORKERS * 2) -> int:
+    """Write `text` as speech to `output`; returns the number of chunks.
+
+    At most a few chunks per worker are in flight ahead of the writer. Each
+    chunk is saved under `<output>.parts` as soon as it is synthesized, and
+    reused from there by a rerun; the folder is removed once the output is
+    complete. `progress(done, total)` is called after each chunk is written.
+    """
+    chunks = split_sentences(text, max_chars)
+    if not chunks:
+        raise ValueError("Nothing to synthesize")
+    parts = AudioCache(output + ".parts", max_bytes=sys.maxsize, suffix=engine.suffix)
+    keys = [AudioCache.key(engine.name, chunk, **engine.options) for chunk in chunks]
+
+    own_pool = pool is None
+    if own_pool:
+        pool = make_pool(engine)
+
+    def submit(index):
+        # The chunk is saved as soon as it is synthesized, not when the writer gets to it
+        saved = Future()
+
+        def store(task):
+            if task.cancelled():
+                saved.cancel()
+                return
+            try:
+                audio = task.result()
+                parts.put(keys[index], audio)
+            except BaseException as e:
+                saved.set_exception(e)
+            else:
+                saved.set_result(audio)
+
+        task = pool.submit(_synthesize_chunk, engine, chunks[index])
+        task.add_done_callback(store)
+        return task, saved
+
+    appender = AudioAppender(output)
+    pending = deque()
+    try:
+        next_index = 0
+        for index in range(len(chunks)):
+            # Keep up to `ahead` chunks that are not on disk yet queued in the pool
+            while next_index < len(chunks) and len(pending) < ahead:
+                pending.append(None if keys[next_index] in parts else submit(next_index))
+                next_index += 1
+            queued = pending.popleft()
+            audio = parts.get(keys[index]) if queued is None else queued[1].result()
+            if audio is None:
+                audio = submit(index)[1].result()
+            appender.append(audio)
+            if progress:
+                progress(index + 1, len(chunks))
+    except BaseException:
+        for queued in pending:
+            if queued is not None:
+                queued[0].cancel()
+        raise
+    finally:
+        appender.close()
+        if own_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+    shutil.rmtree(parts.directory, ignore_errors=True)
+    return len(chunks)
+
+
+def synthesize_file(path: str, output: str, engine: TTSEngine, pool=None, max_chars: int = CHUNK_CHARS,
+                    progress: Optional[Callable[[int, int], None]] = None) -> int:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return synthesize_text(text, output, engine, pool, max_chars, progress)
+
+
+def synthesize_directory(folder: str, out_dir: str, engine: TTSEngine, workers: int = TTS_WORKERS,
+                         max_chars: int = CHUNK_CHARS, force: bool = False) -> dict:
+    """Convert every .txt file in `folder` into `out_dir/<name><engine suffix>`.
+
+    One worker pool is shared by all documents. Outputs that exist without a
+    `.parts` folder are complete and skipped (unless `force`); interrupted
+    ones resume. Empty documents are skipped too. Returns totals for the run.
+    """
+    files = sorted(glob.glob(os.path.join(folder, "*.txt")))
+    os.makedirs(out_dir, exist_ok=True)
+    totals = {"files": 0, "skipped": 0, "failed": 0, "chunks": 0, "chars": 0, "audio_bytes": 0}
+    started = time.perf_counter()
+    with make_pool(engine, workers) as pool:
+        for path in files:
+            name = os.path.splitext(os.path.basename(path))[0]
+            output = os.path.join(out_dir, name + engine.suffix)
+            if not force and os.path.exists(output) and not os.path.isdir(output + ".parts"):
+                totals["skipped"] += 1
+                continue
+
+            def progress(done, total):
+                print(f"\r🔊 {name}: {done}/{total} chunks", end="", flush=True)
+
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                if not text.strip():
+                    print(f"⚠️ {name}: empty, skipped")
+                    totals["skipped"] += 1
+                    continue
+                totals["chunks"] += synthesize_text(text, output, engine, pool, max_chars, progress,
+                                                    ahead=workers * 2)
+            except Exception as e:
+                print(f"\n❌ {name}: {e}")
+                totals["failed"] += 1
+                continue
+            print()
+            totals["files"] += 1
+            totals["chars"] += len(text)
+            totals["audio_bytes"] += os.path.getsize(output)
+    totals["seconds"] = round(time.perf_counter() - started, 2)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a folder of .txt files to speech")
+    parser.add_argument("folder", help="Folder of .txt files")
+    parser.add_argument("out_dir", help="Folder for the audio files")
+    parser.add_argument("--engine", choices=list(ENGINES), default="gtts",
+                        help="gtts (online, MP3) or pyttsx3 (offline, WAV)")
+    parser.add_argument("--workers", type=int, default=TTS_WORKERS, help="Chunks synthesized in parallel")
+    parser.add_argument("--chunk-chars", type=int, default=CHUNK_CHARS, help="Maximum characters per chunk")
+    parser.add_argument("--lang", default="en", help="Language for gtts")
+    parser.add_argument("--force", action="store_true", help="Redo documents that are already complete")
+    args = parser.parse_args(argv)
+
+    engine = load_engine(args.engine, lang=args.lang) if args.engine == "gtts" else load_engine(args.engine)
+    totals = synthesize_directory(args.folder, args.out_dir, engine, args.workers, args.chunk_chars, args.force)
+    rate = totals["chars"] / totals["seconds"] if totals["seconds"] else 0.0
+    print(f"✅ {totals['files']} converted, {totals['skipped']} skipped (done or empty), {totals['failed']} failed: "
+          f"{totals['chunks']} chunks in {totals['seconds']}s ({rate:.0f} chars/s)")
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Content-addressed on-disk cache for synthesized speech.
+
+The key is a hash of everything that determines the audio (engine, text,
+language, voice options), so identical phrases are synthesized once and then
+served from disk. Files are evicted least recently used first once the cache
+grows past `max_bytes`.
+
+    cache = AudioCache()
+    key = cache.key("gtts", text, lang="en")
+    audio = cache.get(key)
+    if audio is None:
+        audio = synthesize(text)
+        cache.put(key, audio)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pythonlibs", "tts"))
+TTS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class AudioCache:
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES, suffix: str = ".mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # key -> (last use, size); rebuilt from the files so the LRU order survives restarts
+        self._index = {}
+        for name in os.listdir(directory):
+            if name.endswith(suffix):
+                stat = os.stat(os.path.join(directory, name))
+                self._index[name[:-len(suffix)]] = (stat.st_mtime, stat.st_size)
+        self._total = sum(size for _, size in self._index.values())
+
+    @staticmethod
+    def key(engine: str, text: str, **options) -> str:
+        payload = json.dumps([engine, text, options], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._forget(key)
+                self.misses += 1
+                return None
+            now = time.time()
+            os.utime(path, (now, now))
+            self._index[key] = (now, len(data))
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            # Write to a temp file and rename, so readers never see half a file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            self._forget(key)
+            self._index[key] = (time.time(), len(data))
+            self._total += len(data)
+            self._evict()
+
+    def _forget(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._total -= entry[1]
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][0]):
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._forget(key)
+            if self._total <= self.max_bytes:
+                break